@@ -1,26 +1,73 @@
-import pyaudio
 import json
-import math
 import threading
 import audioop
 import os
-from vosk import Model, KaldiRecognizer
+import time
+from decoder import StreamDecoder, ProfileGovernor, DECODE_PROFILES
+from model_cache import ModelCache
+from audio_sources import MicrophoneSource
+from engine_metrics import EngineMetrics
+
+# vosk (and numpy, for the resampler) are imported on first use so that
+# importing this module doesn't slow down app startup
+def _load_vosk_model(model_path):
+    from vosk import Model
+    return Model(model_path)
 
 class AudioEngine:
-    def __init__(self):
+    def __init__(self, source=None, use_process=False, model_cache_bytes=1024 * 1024 * 1024, adaptive=True,
+                 partial_interval=0.12):
+        self.source = source or MicrophoneSource() # Where PCM comes from (see audio_sources.py)
+        self.models = ModelCache(_load_vosk_model, max_bytes=model_cache_bytes)
+        self.model_cache_bytes = model_cache_bytes
+        self.model = None
         self.recognizer = None
-        self.stream = None
-        self.p = pyaudio.PyAudio()
-        self.is_running = False
-        self.is_paused = False
-        self.is_mic_active = True
-        self.on_result = None          # Callback(text, is_final)
-        self.on_audio_level = None     # Callback(level_float_0_to_1)
+        self.decoder = None
+        self.use_process = use_process # Decode in a worker process (see decoder_process.py)
+        self.decoder_process = None
+        self.model_path = None
+        self.grammar = None            # Optional list of phrases to restrict recognition to
+        self.partial_interval = partial_interval # Seconds of audio between partial-result polls
+        self.on_result = None          # Callback(text, is_final, captured) - captured: perf_counter() of the chunk
+        self.on_finished = None        # Callback() when a finite source runs out
+        self.level_peak = 0.0          # Peak input level (0..1) since last take_level()
         self.thread = None
+        self.resampler = None          # Set while capturing at a rate other than 16 kHz mono
+        self.metrics = EngineMetrics()
+        self.max_restart_delay = 10.0  # Backoff cap (seconds) when the reader loop keeps failing
+        self._overrun_base = 0
+        self.adaptive = adaptive       # Step through lighter decoder profiles when falling behind
+        self.governor = ProfileGovernor()
         self.current_lang = None
+        self._load_lock = threading.Lock() # Serializes model loads
+        self._process_lock = threading.Lock() # Loads and preloads may both start the worker
+        self._load_generation = 0
 
-    def load_model(self, lang_code="tr"):
-        """Loads model for the specified language code."""
+        # Lifecycle: the reader thread owns the source and waits on these events
+        self._stop_event = threading.Event()
+        self._unpaused = threading.Event()
+        self._unpaused.set()
+        self._mic_on = threading.Event()
+        self._mic_on.set()
+
+        # A new decoder is handed over here and picked up at the next chunk boundary
+        self._pending_decoder = None
+        self._swap_lock = threading.Lock()
+
+    @property
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive() and not self._stop_event.is_set()
+
+    @property
+    def is_paused(self):
+        return not self._unpaused.is_set()
+
+    @property
+    def is_mic_active(self):
+        return self._mic_on.is_set()
+
+    def model_path_for(self, lang_code):
+        """Returns the model directory for a language, or None if it isn't installed."""
         base_dir = os.path.dirname(os.path.abspath(__file__))
         model_path = os.path.join(base_dir, "models", lang_code)
         
@@ -29,14 +76,80 @@ class AudioEngine:
         if not os.path.exists(model_path) and os.path.exists(legacy_path) and lang_code == "tr":
             model_path = legacy_path
             
-        if not os.path.exists(model_path):
-            print(f"Error: Model not found at '{model_path}'")
+        return model_path if os.path.exists(model_path) else None
+
+    def load_model(self, lang_code="tr"):
+        """Loads model for the specified language code."""
+        with self._load_lock:
+            return self._load_model(lang_code)
+
+    def load_model_async(self, lang_code, on_done=None):
+        """Loads (and warms up) a model on a background thread.
+
+        `on_done(lang_code, success)` is called from that thread. If another
+        load is requested before this one finishes, only the latest request
+        reports back.
+        """
+        self._load_generation += 1
+        generation = self._load_generation
+
+        def worker():
+            with self._load_lock:
+                if generation != self._load_generation:
+                    return # Superseded before we even started
+                success = self._load_model(lang_code)
+            if on_done and generation == self._load_generation:
+                on_done(lang_code, success)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def preload_async(self, lang_code):
+        """Warms the model cache for a language without switching to it."""
+        model_path = self.model_path_for(lang_code)
+        if not model_path:
+            return
+
+        def worker():
+            # In process mode only the worker's cache is ever used
+            if self.use_process and self._start_decoder_process():
+                self.decoder_process.preload(lang_code, model_path)
+                return
+            try:
+                self.models.get(lang_code, model_path)
+            except Exception as e:
+                print(f"Preloading {lang_code} failed: {e}")
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _load_model(self, lang_code):
+        model_path = self.model_path_for(lang_code)
+        if not model_path:
+            print(f"Error: Model not found for '{lang_code}'")
             return False
 
+        if self.use_process:
+            if self._start_decoder_process():
+                print(f"Loading model in decoder process: {model_path}...")
+                if not self.decoder_process.load_model(lang_code, model_path):
+                    if self.decoder_process.is_alive:
+                        return False
+                    self._fall_back_to_thread("decoder process died while loading")
+                    return self._load_local(lang_code, model_path)
+                self.model_path = model_path
+                self.current_lang = lang_code
+                print("Model loaded successfully.")
+                return True
+
+        return self._load_local(lang_code, model_path)
+
+    def _load_local(self, lang_code, model_path):
         try:
             print(f"Loading model: {model_path}...")
-            self.model = Model(model_path)
-            self.recognizer = KaldiRecognizer(self.model, 16000)
+            model = self.models.get(lang_code, model_path, pin=True)
+            decoder = self._make_decoder(model)
+            self.model = model
+            self._install_decoder(decoder)
+            self.model_path = model_path
             self.current_lang = lang_code
             print("Model loaded successfully.")
             return True
@@ -44,76 +157,288 @@ class AudioEngine:
             print(f"Failed to load model: {e}")
             return False
 
+    def _make_decoder(self, model):
+        from vosk import KaldiRecognizer
+        if self.grammar:
+            recognizer = KaldiRecognizer(model, 16000, json.dumps(self.grammar))
+        else:
+            recognizer = KaldiRecognizer(model, 16000)
+        decoder = StreamDecoder(recognizer, self.governor.profile, self.partial_interval)
+        decoder.warm_up(16000)
+        return decoder
+
+    def _install_decoder(self, decoder):
+        """Swaps in a decoder without touching the audio stream.
+
+        While capturing, the reader thread picks it up between two chunks, so a
+        chunk is never half-fed to the old recognizer and half to the new one.
+        """
+        with self._swap_lock:
+            if self.is_running:
+                self._pending_decoder = decoder
+            else:
+                self._pending_decoder = None
+                self.decoder = decoder
+                self.recognizer = decoder.recognizer
+
+    def set_grammar(self, phrases):
+        """Restricts recognition to `phrases` (None lifts it) by hot-swapping the recognizer."""
+        self.grammar = list(phrases) if phrases else None
+        if self.decoder_process:
+            self.decoder_process.set_grammar(self.grammar)
+        elif self.model is not None:
+            with self._load_lock:
+                self._install_decoder(self._make_decoder(self.model))
+
+    def _start_decoder_process(self):
+        """Spawns the decoder worker once. Falls back to threaded decoding if that fails."""
+        with self._process_lock:
+            if self.decoder_process and self.decoder_process.is_alive:
+                return True
+            if not self.use_process:
+                return False # Already fell back
+            try:
+                from decoder_process import ProcessDecoder
+                self.decoder_process = ProcessDecoder(16000, self.model_cache_bytes, self.partial_interval)
+                self.decoder_process.on_result = self._emit_result
+                self.decoder_process.on_stats = self._on_decoder_stats
+                self.decoder_process.set_profile(self.governor.level)
+                return True
+            except Exception as e:
+                self._fall_back_to_thread(e)
+                return False
+
+    def _fall_back_to_thread(self, reason):
+        print(f"Decoder process unavailable ({reason}), falling back to threaded decoding.")
+        self.use_process = False
+        if self.decoder_process:
+            self.decoder_process.close()
+            self.decoder_process = None
+
+    def _on_decoder_stats(self, decode_seconds, audio_seconds, chunks):
+        self.metrics.record_decode(decode_seconds, audio_seconds, chunks)
+        self._govern()
+
+    def _govern(self):
+        """Moves to a lighter/heavier decoder profile when the real-time factor calls for it."""
+        if not self.adaptive or self.metrics.window_audio_seconds < 3.0:
+            return # Not enough measurements since the last change
+        level = self.governor.update(self.metrics.real_time_factor)
+        if level is None:
+            return
+        self.metrics.profile = DECODE_PROFILES[level]["name"]
+        self.metrics.clear_window()
+        if self.decoder_process:
+            self.decoder_process.set_profile(level)
+        else:
+            self.decoder.set_profile(DECODE_PROFILES[level])
+
+    def _emit_result(self, text, is_final, captured):
+        if self.on_result:
+            self.on_result(text, is_final, captured)
+
+    @property
+    def is_model_loaded(self):
+        return self.decoder is not None or (self.decoder_process is not None and self.model_path is not None)
+
     def start(self):
-        if self.is_running: return
+        """Opens the audio source and starts the reader thread. Returns False if that failed."""
+        if self.is_running: return True
         
-        if not self.recognizer:
+        if not self.is_model_loaded:
             print("No model loaded. Call load_model() first.")
-            return
+            return False
+
+        # A previous stop() may still be finishing its last read
+        if self.thread and self.thread.is_alive():
+            self.thread.join()
 
-        self.is_running = True
-        self.is_paused = False
-        self.stream = self.p.open(format=pyaudio.paInt16,
-                                  channels=1,
-                                  rate=16000,
-                                  input=True,
-                                  frames_per_buffer=1024)
+        source = self.source
+        self._stop_event.clear()
+        self._unpaused.set()
+        self.metrics.reset()
+        self.metrics.profile = self.governor.profile["name"]
+        self._overrun_base = source.overruns
+        try:
+            self._open_source(source)
+        except RuntimeError as e:
+            print(e)
+            return False
+        except OSError as e: # No device, unreadable file, ...
+            print(f"Could not open the audio source: {e}")
+            return False
         
-        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread = threading.Thread(target=self._run, args=(source,), daemon=True)
         self.thread.start()
+        return True
+
+    def _open_source(self, source):
+        source.open()
+        # Vosk wants 16 kHz mono; convert anything else on the reader thread
+        self.resampler = None
+        if source.sample_rate != 16000 or source.channels != 1:
+            from resampler import Resampler
+            try:
+                self.resampler = Resampler(source.sample_rate, source.channels, 16000)
+            except RuntimeError as e:
+                source.close()
+                raise RuntimeError(f"Cannot use {source.sample_rate} Hz, {source.channels} channel(s) audio: {e}")
+
+    def wait(self, timeout=None):
+        """Blocks until the reader thread ends, e.g. when a file source is exhausted."""
+        if self.thread:
+            self.thread.join(timeout)
 
     def pause(self):
-        self.is_paused = True
+        self._unpaused.clear()
 
     def resume(self):
-        self.is_paused = False
+        self._unpaused.set()
 
     def set_mic_enabled(self, enabled):
-        self.is_mic_active = enabled
+        if enabled:
+            self._mic_on.set()
+        else:
+            self._mic_on.clear()
+
+    def get_metrics(self):
+        """Snapshot of pipeline health (decode time, real-time factor, overruns, ...) as a dict."""
+        self._refresh_queue_depth()
+        return self.metrics.snapshot()
+
+    def _refresh_queue_depth(self):
+        frames = self.source.pending_frames() if self.is_running else 0
+        depth = frames // max(1, self.source.chunk_frames)
+        if self.decoder_process:
+            depth += self.decoder_process.queue_depth()
+        self.metrics.queue_depth = depth
+
+    def take_level(self):
+        """Returns the peak input level since the last call and resets it.
+
+        The UI polls this at its own refresh rate instead of receiving a
+        callback for every audio chunk.
+        """
+        level, self.level_peak = self.level_peak, 0.0
+        return level
 
     def stop(self):
-        self.is_running = False
-        if self.thread:
+        """Stops capture. The reader thread closes the source itself once its current read returns."""
+        self._stop_event.set()
+        if self.thread and self.thread is not threading.current_thread():
             self.thread.join(timeout=1.0)
-        
-        if self.stream:
-            self.stream.stop_stream()
-            self.stream.close()
-            self.stream = None
-            
+            if self.thread.is_alive():
+                print("Audio thread still finishing its last read; it will close the source.")
+
+    def close(self):
+        """Stops capture and shuts down the decoder process, if any."""
+        self.stop()
+        if self.decoder_process:
+            self.decoder_process.close()
+            self.decoder_process = None
+
     def restart(self):
-        """Restarts the audio stream (useful after model change)."""
+        """Reopens the audio source (e.g. after a device change). Model switches don't need this."""
         was_running = self.is_running
         self.stop()
         if was_running:
             self.start()
 
-    def _loop(self):
-        while self.is_running and self.stream:
-            try:
-                data = self.stream.read(1024, exception_on_overflow=False)
-                if len(data) == 0: break
-                
-                # 1. Calculate RMS for visualization (always do this if running)
-                rms = audioop.rms(data, 2)
-                level = min(1.0, (rms / 2000)) 
-                
-                if self.on_audio_level:
-                    self.on_audio_level(level if (not self.is_paused and self.is_mic_active) else 0)
-
-                # 2. Feed to Vosk only if not paused and mic is active
-                if self.is_paused or not self.is_mic_active:
+    def _take_pending_decoder(self):
+        with self._swap_lock:
+            decoder, self._pending_decoder = self._pending_decoder, None
+        if decoder:
+            self.decoder = decoder
+            self.recognizer = decoder.recognizer
+
+    def _run(self, source):
+        """Reader thread: runs the capture loop and restarts it with backoff if it fails."""
+        failures = 0
+        try:
+            while not self._stop_event.is_set():
+                started = time.monotonic()
+                try:
+                    if self._loop(source):
+                        break # Source exhausted
+                except Exception as e:
+                    self.metrics.record_error(e)
+                    # A loop that ran fine for a while starts over with a short delay
+                    failures = 1 if time.monotonic() - started > 30 else failures + 1
+                    delay = min(self.max_restart_delay, 0.5 * 2 ** (failures - 1))
+                    print(f"Audio loop error: {e}. Restarting in {delay:.1f}s (restart #{self.metrics.restarts})")
+                    source.close()
+                    while not self._stop_event.wait(delay):
+                        try:
+                            self._open_source(source)
+                            break
+                        except Exception as e:
+                            self.metrics.record_error(e)
+                            failures += 1
+                            delay = min(self.max_restart_delay, 0.5 * 2 ** (failures - 1))
+                            print(f"Reopening audio failed: {e}. Retrying in {delay:.1f}s")
+        finally:
+            # Only this thread ever reads, so only it closes: no read/close race
+            self._stop_event.set()
+            source.close()
+            if self.resampler:
+                print(self.resampler.describe())
+            print(f"Audio pipeline: {self.metrics.describe()}")
+            # A decoder handed over during the last chunk must not get lost
+            self._take_pending_decoder()
+
+    def _loop(self, source):
+        """Reads and decodes until stopped (returns False) or the source runs out (returns True)."""
+        while not self._stop_event.is_set():
+            data = source.read(source.chunk_frames)
+            captured = time.perf_counter() # End of this chunk's audio; start of its latency trace
+            if len(data) == 0:
+                self._finish(captured)
+                return True
+            if self.resampler:
+                data = self.resampler.process(data)
+            self.metrics.overruns = source.overruns - self._overrun_base
+
+            # Chunk boundary: adopt a freshly loaded recognizer, if any
+            if self._pending_decoder is not None:
+                self._take_pending_decoder()
+            
+            # Nothing is metered or decoded while paused or muted
+            if not (self._unpaused.is_set() and self._mic_on.is_set()):
+                continue
+
+            # 1. Aggregate RMS for visualization; the UI picks up the peak
+            rms = audioop.rms(data, 2)
+            level = min(1.0, (rms / 2000))
+            if level > self.level_peak:
+                self.level_peak = level
+
+            # 2. Feed to Vosk, either here or in the decoder process
+            if self.decoder_process:
+                if not self.decoder_process.is_alive:
+                    self._fall_back_to_thread("decoder process exited")
+                    if not self._load_local(self.current_lang, self.model_path):
+                        raise RuntimeError("decoder process exited and the model could not be loaded locally")
                     continue
+                # Live audio may be dropped if the worker lags; recordings must not be
+                if not self.decoder_process.feed(data, block=not source.realtime, captured=captured):
+                    self.metrics.dropped += 1
+                continue
 
-                if self.recognizer.AcceptWaveform(data):
-                    res = json.loads(self.recognizer.Result())
-                    if 'text' in res and self.on_result:
-                         self.on_result(res['text'], True)
-                else:
-                    res = json.loads(self.recognizer.PartialResult())
-                    if 'partial' in res and self.on_result:
-                        self.on_result(res['partial'], False)
+            decode_started = time.perf_counter()
+            result = self.decoder.feed(data)
+            self.metrics.record_decode(time.perf_counter() - decode_started, len(data) / 32000)
+            self._govern()
+            if result:
+                self._emit_result(*result, captured)
+        return False
 
-            except Exception as e:
-                print(f"Audio loop error: {e}")
-                break
+    def _finish(self, captured):
+        """End of a recording: deliver whatever is still in the recognizer."""
+        if self.decoder_process:
+            self.decoder_process.flush()
+        else:
+            result = self.decoder.flush()
+            if result:
+                self._emit_result(*result, captured)
+        if self.on_finished:
+            self.on_finished()
@@ -0,0 +1,194 @@
+"""Audio sources that AudioEngine pulls 16-bit PCM chunks from.
+
+Besides the microphone, recordings can be fed from a WAV/raw PCM file or a
+pipe, so recognition and tracking can run headlessly (CI, benchmarks,
+re-running recorded rehearsals faster than real time).
+"""
+import audioop
+import os
+import sys
+import time
+import wave
+
+class AudioSource:
+    """Base class. `read()` returns interleaved 16-bit PCM, or b"" at end of stream."""
+    sample_rate = 16000
+    channels = 1
+    realtime = True # False: the source can deliver faster than real time and must not be dropped
+    chunk_ms = 64   # How much audio AudioEngine reads per chunk
+    overruns = 0    # Input overflows the device reported (audio lost before we could read it)
+
+    @property
+    def chunk_frames(self):
+        return max(1, self.sample_rate * self.chunk_ms // 1000)
+
+    def open(self):
+        pass
+
+    def read(self, frames):
+        raise NotImplementedError
+
+    def pending_frames(self):
+        """Frames already captured but not yet read."""
+        return 0
+
+    def close(self):
+        pass
+
+class MicrophoneSource(AudioSource):
+    """An input device via PyAudio.
+
+    By default it opens at the device's native rate and channel count (up to
+    stereo); AudioEngine resamples to 16 kHz mono. Without numpy there is no
+    resampler, so it asks the driver for 16 kHz mono as before.
+    """
+
+    def __init__(self, chunk_ms=64, sample_rate=None, channels=None, device_index=None):
+        self.chunk_ms = chunk_ms
+        self.requested_rate = sample_rate
+        self.requested_channels = channels
+        self.sample_rate = sample_rate or 16000
+        self.channels = channels or 1
+        self.device_index = device_index
+        self.pa = None
+        self.stream = None
+
+    def open(self):
+        import pyaudio # Only needed when actually capturing
+        import resampler
+        if self.pa is None:
+            self.pa = pyaudio.PyAudio()
+        self._overflow_errno = pyaudio.paInputOverflowed
+
+        self.sample_rate = self.requested_rate or 16000
+        self.channels = self.requested_channels or 1
+        if resampler.AVAILABLE and not (self.requested_rate and self.requested_channels):
+            if self.device_index is None:
+                info = self.pa.get_default_input_device_info()
+            else:
+                info = self.pa.get_device_info_by_index(self.device_index)
+            self.sample_rate = self.requested_rate or int(info["defaultSampleRate"])
+            self.channels = self.requested_channels or max(1, min(2, int(info["maxInputChannels"])))
+
+        print(f"Opening microphone at {self.sample_rate} Hz, {self.channels} channel(s)")
+        self.stream = self.pa.open(format=pyaudio.paInt16,
+                                   channels=self.channels,
+                                   rate=self.sample_rate,
+                                   input=True,
+                                   input_device_index=self.device_index,
+                                   frames_per_buffer=self.chunk_frames)
+
+    def read(self, frames):
+        try:
+            return self.stream.read(frames, exception_on_overflow=True)
+        except OSError as e:
+            if e.errno != self._overflow_errno:
+                raise
+            # That chunk is gone; count it and carry on with the next one
+            self.overruns += 1
+            return self.stream.read(frames, exception_on_overflow=False)
+
+    def pending_frames(self):
+        return self.stream.get_read_available() if self.stream else 0
+
+    def close(self):
+        if self.stream:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+
+class _PacedSource(AudioSource):
+    """Optionally throttles reads to real time, as if the audio were being captured live."""
+
+    def __init__(self, realtime):
+        self.realtime = realtime
+        self._started = None
+        self._frames_read = 0
+
+    def _pace(self, frames):
+        if not self.realtime:
+            return
+        now = time.monotonic()
+        if self._started is None:
+            self._started = now
+        self._frames_read += frames
+        delay = self._started + self._frames_read / self.sample_rate - now
+        if delay > 0:
+            time.sleep(delay)
+
+class WavFileSource(_PacedSource):
+    """A .wav file (8, 16, 24 or 32-bit PCM), or a headerless file of little-endian 16-bit PCM (rate/channels given)."""
+
+    def __init__(self, path, realtime=True, sample_rate=16000, channels=1):
+        super().__init__(realtime)
+        self.path = path
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self._wav = None
+        self._raw = None
+        self._width = 2 # Bytes per sample in the file; converted to 16-bit on read
+
+    def open(self):
+        self._started = None
+        self._frames_read = 0
+        if os.path.splitext(self.path)[1].lower() == ".wav":
+            # RuntimeError is what AudioEngine.start() reports as a one-line error
+            try:
+                self._wav = wave.open(self.path, "rb")
+            except (wave.Error, EOFError) as e:
+                raise RuntimeError(f"{self.path}: not a readable PCM WAV file ({e})")
+            self._width = self._wav.getsampwidth()
+            if self._width not in (1, 2, 3, 4):
+                self._wav.close()
+                self._wav = None
+                raise RuntimeError(f"{self.path}: unsupported sample width of {self._width} bytes")
+            self.sample_rate = self._wav.getframerate()
+            self.channels = self._wav.getnchannels()
+        else:
+            self._raw = open(self.path, "rb")
+
+    def read(self, frames):
+        if self._wav:
+            data = self._wav.readframes(frames)
+            if self._width == 1:
+                data = audioop.bias(data, 1, -128) # 8-bit WAV is unsigned
+            if self._width != 2:
+                data = audioop.lin2lin(data, self._width, 2)
+        else:
+            data = self._raw.read(frames * self.channels * 2)
+        self._pace(len(data) // (self.channels * 2))
+        return data
+
+    def close(self):
+        if self._wav:
+            self._wav.close()
+            self._wav = None
+        if self._raw:
+            self._raw.close()
+            self._raw = None
+
+class PipeSource(_PacedSource):
+    """Raw little-endian 16-bit PCM from a binary stream, stdin by default."""
+
+    def __init__(self, stream=None, sample_rate=16000, channels=1, realtime=False):
+        super().__init__(realtime)
+        self.stream = stream
+        self.sample_rate = sample_rate
+        self.channels = channels
+
+    def open(self):
+        if self.stream is None:
+            self.stream = sys.stdin.buffer
+
+    def read(self, frames):
+        # Pipes may return short reads; collect a whole chunk unless the writer closed
+        wanted = frames * self.channels * 2
+        data = b""
+        while len(data) < wanted:
+            piece = self.stream.read(wanted - len(data))
+            if not piece:
+                break
+            data += piece
+        data = data[:len(data) - len(data) % (self.channels * 2)] # Whole frames only
+        self._pace(len(data) // (self.channels * 2))
+        return data
@@ -0,0 +1,77 @@
+"""Time-based auto-advance: moves a TeleprompterSession at a target words per minute.
+
+Call tick() once per display frame. The position advances by elapsed time
+times the rate, in fractional words, so the speed doesn't depend on frame
+rate or on how long the words are; the session (and so every display) only
+hears about it when the character offset actually changes.
+"""
+import time
+
+SPEED_LEVELS_WPM = (0, 90, 120, 150, 180, 210) # Speed button levels: OFF, 1x..5x
+
+class AutoScroller:
+    """Advances a session through its words at `wpm`.
+
+    It moves the session with seek(), which leaves the speech matching
+    anchor alone. Any move the scroller didn't make itself (speech getting
+    ahead of it, rewind/forward, a remote jump) re-anchors it there. With
+    `follow_voice` set (mic on) it fills the gaps between recognizer results
+    but never runs more than `max_lead_words` ahead of where speech last
+    matched, so it waits for a speaker who stops instead of scrolling away.
+    """
+    max_step = 0.1 # Longest elapsed time (s) applied in one tick, e.g. after a pause
+
+    def __init__(self, session, wpm=0, follow_voice=False, max_lead_words=4):
+        self.session = session
+        self.wpm = wpm
+        self.follow_voice = follow_voice
+        self.max_lead_words = max_lead_words
+        self.word = 0.0 # Fractional word index
+        self._offset = None # Offset of our last move; anything else moved the session
+        self._last_tick = None
+
+    def set_wpm(self, wpm):
+        self.wpm = wpm
+        self._last_tick = None # Don't count the time spent stopped
+
+    def tick(self, now=None):
+        """Advances by the time since the previous tick. Returns True if the position moved."""
+        now = time.monotonic() if now is None else now
+        elapsed = 0.0 if self._last_tick is None else min(self.max_step, now - self._last_tick)
+        self._last_tick = now
+        starts = self.session.matcher.word_starts
+        if not self.wpm or not starts:
+            return False
+
+        offset = self.session.offset
+        if offset != self._offset:
+            self.word = self._fractional_word(offset, starts)
+
+        word = self.word + elapsed * self.wpm / 60
+        if self.follow_voice:
+            spoken = self.session.matcher.word_index_at(self.session.spoken_offset)
+            word = min(word, max(self.word, spoken + self.max_lead_words))
+        self.word = min(word, len(starts))
+
+        target = self._offset_at(self.word, starts)
+        self._offset = target
+        if target == offset:
+            return False
+        self.session.seek(target)
+        self._offset = self.session.offset
+        return True
+
+    def _offset_at(self, word, starts):
+        index = int(word)
+        end = len(self.session.script)
+        if index >= len(starts):
+            return end
+        next_start = starts[index + 1] if index + 1 < len(starts) else end
+        return starts[index] + int((word - index) * (next_start - starts[index]))
+
+    def _fractional_word(self, offset, starts):
+        index = self.session.matcher.word_index_at(offset)
+        end = len(self.session.script)
+        next_start = starts[index + 1] if index + 1 < len(starts) else end
+        span = next_start - starts[index]
+        return index + (min(1.0, max(0, offset - starts[index]) / span) if span else 0.0)
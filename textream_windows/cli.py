@@ -0,0 +1,103 @@
+"""Headless Textream: streams script positions as JSON lines, no display needed.
+
+    python cli.py script.txt --lang en                   # microphone
+    python cli.py script.txt --lang en --wav take1.wav   # recording, as fast as it decodes
+    arecord -f S16_LE -r 16000 | python cli.py script.txt --stdin
+
+Each line on stdout is a position event (see session.TeleprompterSession);
+logs go to stderr.
+"""
+import sys
+import os
+import json
+import argparse
+import contextlib
+import multiprocessing
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Track a script against speech and print positions as JSON lines.")
+    parser.add_argument("script", help="script text file (UTF-8), or - for none")
+    parser.add_argument("--lang", default="en", help="recognition language code (default: en)")
+    audio = parser.add_mutually_exclusive_group()
+    audio.add_argument("--wav", metavar="PATH", help="read a .wav file, or raw 16-bit PCM with --rate/--channels")
+    audio.add_argument("--stdin", action="store_true", help="read raw 16-bit PCM from stdin")
+    parser.add_argument("--rate", type=int, default=16000, help="sample rate of raw PCM input")
+    parser.add_argument("--channels", type=int, default=1, help="channel count of raw PCM input")
+    parser.add_argument("--realtime", action="store_true", help="pace file input like a live recording")
+    parser.add_argument("--process", action="store_true", help="decode in a separate process")
+    parser.add_argument("--latency-csv", metavar="PATH", help="append a latency trace per result to PATH")
+    parser.add_argument("--serve", metavar="PORT", type=int, nargs="?", const=8765,
+                        help="also broadcast positions on localhost:PORT (default 8765)")
+    return parser.parse_args(argv)
+
+def make_source(args):
+    from audio_sources import MicrophoneSource, WavFileSource, PipeSource
+    if args.wav:
+        return WavFileSource(args.wav, realtime=args.realtime, sample_rate=args.rate, channels=args.channels)
+    if args.stdin:
+        return PipeSource(sample_rate=args.rate, channels=args.channels, realtime=args.realtime)
+    return MicrophoneSource()
+
+def main(argv=None):
+    multiprocessing.freeze_support()
+    args = parse_args(argv)
+    out = sys.stdout
+
+    # Engine and model logs would corrupt the JSON stream
+    with contextlib.redirect_stdout(sys.stderr):
+        from audio_engine import AudioEngine
+        from session import TeleprompterSession
+        from latency import LatencyTracer
+
+        script = ""
+        if args.script != "-":
+            with open(args.script, encoding="utf-8") as f:
+                script = f.read()
+
+        engine = AudioEngine(make_source(args), use_process=args.process)
+        tracer = LatencyTracer(csv_path=args.latency_csv) if args.latency_csv else None
+        session = TeleprompterSession(script, args.lang, engine=engine, tracer=tracer)
+
+        def emit(event):
+            out.write(json.dumps(event, separators=(",", ":")) + "\n")
+            out.flush()
+
+        session.listeners.append(emit)
+        server = None
+        try:
+            if args.serve is not None:
+                from position_server import PositionServer, apply_command
+                server = PositionServer(port=args.serve)
+                server.on_command = lambda cmd: apply_command(session, cmd)
+                try:
+                    server.start()
+                except OSError as e:
+                    print(f"Position server could not start on port {args.serve}: {e}")
+                    server = None
+                    return 1
+                session.listeners.append(server.publish)
+            if not session.load_model():
+                return 1
+            initial = session.position()
+            emit(initial)
+            if server:
+                server.publish(initial)
+            if not session.start():
+                return 1
+            while engine.is_running:
+                session.wait(0.5)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if tracer and tracer.count:
+                print(f"Latency (p50/p95): {tracer.describe()}")
+                print(f"Total latency histogram: {tracer.describe_histogram()}")
+            if server:
+                server.close()
+            session.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
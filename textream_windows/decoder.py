@@ -0,0 +1,122 @@
+import audioop
+import json
+import time
+
+# Decoding profiles from full quality to lightest, stepped through when decoding
+# can't keep up with real time.
+#   partial_scale: multiplies the partial polling interval (0 = finals only)
+#   vad_gate:      skip decoding during sustained silence
+DECODE_PROFILES = [
+    {"name": "full", "partial_scale": 1, "vad_gate": False},
+    {"name": "fewer-partials", "partial_scale": 3, "vad_gate": False},
+    {"name": "vad-gated", "partial_scale": 3, "vad_gate": True},
+    {"name": "finals-only", "partial_scale": 0, "vad_gate": True},
+]
+
+class StreamDecoder:
+    """Feeds PCM chunks to a KaldiRecognizer and turns its JSON output into results.
+
+    Used both by the in-process audio loop and by the decoder worker process,
+    so the two modes behave identically. Partials are polled at most every
+    `partial_interval` seconds of audio, independent of the chunk size, and
+    only reported when their text changed; finals are reported right away.
+    """
+    vad_threshold = 300   # RMS below this counts as silence when gating
+    vad_hangover = 5      # Silent chunks still decoded before gating kicks in (lets Kaldi endpoint)
+
+    def __init__(self, recognizer, profile=None, partial_interval=0.12, sample_rate=16000):
+        self.recognizer = recognizer
+        self.profile = profile or DECODE_PROFILES[0]
+        self.partial_interval = partial_interval
+        self.sample_rate = sample_rate
+        self._since_partial = 0.0 # Audio seconds fed since the last PartialResult()
+        self._last_partial = None
+        self._silent_chunks = 0
+        self._in_speech = False
+
+    def set_profile(self, profile):
+        self.profile = profile
+
+    def warm_up(self, sample_rate, seconds=0.5):
+        """Decodes a little silence so the first real utterance doesn't pay for lazy initialization."""
+        self.recognizer.AcceptWaveform(b"\x00\x00" * int(sample_rate * seconds))
+        self.recognizer.FinalResult() # Flush so the warm-up leaves no state behind
+
+    def feed(self, data):
+        """Decodes one chunk. Returns (text, is_final) or None."""
+        if self.profile["vad_gate"]:
+            if audioop.rms(data, 2) < self.vad_threshold:
+                self._silent_chunks += 1
+                if self._silent_chunks > self.vad_hangover:
+                    if self._in_speech:
+                        # Kaldi won't see the rest of the pause, so end the utterance ourselves
+                        self._in_speech = False
+                        return self.flush()
+                    return None
+            else:
+                self._silent_chunks = 0
+                self._in_speech = True
+
+        if self.recognizer.AcceptWaveform(data):
+            self._since_partial = 0.0
+            self._last_partial = None
+            res = json.loads(self.recognizer.Result())
+            if 'text' in res:
+                return res['text'], True
+            return None
+
+        scale = self.profile["partial_scale"]
+        self._since_partial += len(data) / (2 * self.sample_rate)
+        if not scale or self._since_partial < self.partial_interval * scale:
+            return None
+        self._since_partial = 0.0
+        res = json.loads(self.recognizer.PartialResult())
+        partial = res.get('partial')
+        if partial is None or partial == self._last_partial:
+            return None # Usually nothing new was recognized since the last poll
+        self._last_partial = partial
+        return partial, False
+
+    def flush(self):
+        """Ends the current utterance, e.g. at the end of a recording. Returns (text, True) or None."""
+        self._since_partial = 0.0
+        self._last_partial = None
+        res = json.loads(self.recognizer.FinalResult())
+        if res.get('text'):
+            return res['text'], True
+        return None
+
+class ProfileGovernor:
+    """Picks a DECODE_PROFILES level from the rolling real-time factor.
+
+    Steps down one level when decoding is slower than real time and back up
+    when there is clear headroom, waiting `hold_seconds` between changes so
+    the effect of the last step shows up in the measurements first.
+    """
+
+    def __init__(self, degrade_above=1.0, recover_below=0.6, hold_seconds=5.0):
+        self.degrade_above = degrade_above
+        self.recover_below = recover_below
+        self.hold_seconds = hold_seconds
+        self.level = 0
+        self._last_change = time.monotonic()
+
+    @property
+    def profile(self):
+        return DECODE_PROFILES[self.level]
+
+    def update(self, rtf):
+        """Returns the new level if it changed, else None."""
+        now = time.monotonic()
+        if now - self._last_change < self.hold_seconds:
+            return None
+        if rtf > self.degrade_above and self.level < len(DECODE_PROFILES) - 1:
+            new_level = self.level + 1
+        elif rtf < self.recover_below and self.level > 0:
+            new_level = self.level - 1
+        else:
+            return None
+        print(f"Decoder profile: {self.profile['name']} -> {DECODE_PROFILES[new_level]['name']} (RTF {rtf:.2f})")
+        self.level = new_level
+        self._last_change = now
+        return new_level
@@ -0,0 +1,286 @@
+"""Out-of-process Vosk decoding.
+
+Capture stays in the UI process. PCM chunks are handed to a worker process
+through a shared-memory ring buffer; the worker owns the KaldiRecognizer and
+sends results back over a pipe. This keeps decoding off the GIL shared with
+Qt painting and matching.
+"""
+import json
+import struct
+import time
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+
+# Spawn everywhere: forking a process that already runs Qt and audio threads is unsafe
+_ctx = multiprocessing.get_context("spawn")
+
+class PcmRing:
+    """Single-producer/single-consumer ring of fixed-size PCM slots in shared memory."""
+    HEADER = struct.Struct("<Id") # Payload length in bytes, capture time (perf_counter)
+
+    def __init__(self, slots=64, slot_bytes=8192, name=None, free=None, filled=None):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.stride = self.HEADER.size + slot_bytes
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=slots * self.stride)
+        self.free = free if free is not None else _ctx.Semaphore(slots)
+        self.filled = filled if filled is not None else _ctx.Semaphore(0)
+        self.index = 0
+        self.dropped = 0 # Chunks lost because the reader fell behind
+
+    def handle(self):
+        """Picklable description used to attach from the worker process."""
+        return (self.shm.name, self.slots, self.slot_bytes, self.free, self.filled)
+
+    @classmethod
+    def attach(cls, handle):
+        name, slots, slot_bytes, free, filled = handle
+        return cls(slots, slot_bytes, name=name, free=free, filled=filled)
+
+    def write(self, data, block=False, captured=0.0):
+        """Copies a chunk into the ring. Without `block`, drops it (returning False) if the ring is full.
+
+        A chunk spanning several slots is written whole or not at all.
+        """
+        needed = -(-len(data) // self.slot_bytes)
+        acquired = 0
+        while acquired < needed:
+            if not self.free.acquire(block=block):
+                for _ in range(acquired): # Give back what we took; nothing was written yet
+                    self.free.release()
+                self.dropped += 1
+                return False
+            acquired += 1
+        buf = self.shm.buf
+        for start in range(0, len(data), self.slot_bytes):
+            piece = data[start:start + self.slot_bytes]
+            offset = self.index * self.stride
+            self.HEADER.pack_into(buf, offset, len(piece), captured)
+            body = offset + self.HEADER.size
+            buf[body:body + len(piece)] = piece
+            self.index = (self.index + 1) % self.slots
+            self.filled.release()
+        return True
+
+    def read(self, timeout=None):
+        """Returns (chunk, capture time), or None if nothing arrived within `timeout` seconds."""
+        if not self.filled.acquire(timeout=timeout):
+            return None
+        buf = self.shm.buf
+        offset = self.index * self.stride
+        length, captured = self.HEADER.unpack_from(buf, offset)
+        body = offset + self.HEADER.size
+        data = bytes(buf[body:body + length])
+        self.index = (self.index + 1) % self.slots
+        self.free.release()
+        return data, captured
+
+    def depth(self):
+        """Chunks written but not yet read (0 where the platform can't tell)."""
+        try:
+            return self.filled.get_value()
+        except NotImplementedError: # macOS
+            return 0
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+def _worker_main(ring_handle, conn, sample_rate, model_cache_bytes, partial_interval):
+    """Entry point of the decoder process. Commands arrive on `conn`, audio on the ring."""
+    from vosk import Model, KaldiRecognizer
+    from decoder import StreamDecoder, DECODE_PROFILES
+    from model_cache import ModelCache
+
+    ring = PcmRing.attach(ring_handle)
+    models = ModelCache(Model, max_bytes=model_cache_bytes)
+    model = None
+    decoder = None
+    grammar = None
+    profile = DECODE_PROFILES[0]
+    stats = [0.0, 0.0, 0] # decode seconds, audio seconds, chunks since last report
+    captured = 0.0 # Capture time of the last chunk read; results are stamped with it
+
+    def decode(data):
+        started = time.perf_counter()
+        result = decoder.feed(data)
+        stats[0] += time.perf_counter() - started
+        stats[1] += len(data) / (2 * sample_rate)
+        stats[2] += 1
+        if result:
+            conn.send(("result",) + result + (captured,))
+
+    def send_stats():
+        if stats[2]:
+            conn.send(("stats",) + tuple(stats))
+            stats[:] = [0.0, 0.0, 0]
+
+    def make_decoder(model):
+        if grammar:
+            recognizer = KaldiRecognizer(model, sample_rate, json.dumps(grammar))
+        else:
+            recognizer = KaldiRecognizer(model, sample_rate)
+        new_decoder = StreamDecoder(recognizer, profile, partial_interval, sample_rate)
+        new_decoder.warm_up(sample_rate)
+        return new_decoder
+
+    try:
+        while True:
+            while conn.poll():
+                cmd = conn.recv()
+                if cmd[0] == "load":
+                    _, lang_code, model_path = cmd
+                    try:
+                        model = models.get(lang_code, model_path, pin=True)
+                        decoder = make_decoder(model)
+                        conn.send(("loaded", None))
+                    except Exception as e:
+                        conn.send(("loaded", str(e)))
+                elif cmd[0] == "grammar":
+                    grammar = cmd[1]
+                    if model is not None:
+                        decoder = make_decoder(model)
+                elif cmd[0] == "profile":
+                    profile = DECODE_PROFILES[cmd[1]]
+                    if decoder is not None:
+                        decoder.set_profile(profile)
+                elif cmd[0] == "preload":
+                    # Warm the cache without stalling decoding
+                    threading.Thread(target=models.get, args=cmd[1:], daemon=True).start()
+                elif cmd[0] == "flush":
+                    # Decode everything already queued, then end the utterance
+                    while decoder is not None:
+                        item = ring.read(timeout=0)
+                        if item is None:
+                            break
+                        data, captured = item
+                        decode(data)
+                    result = decoder.flush() if decoder else None
+                    if result:
+                        conn.send(("result",) + result + (captured,))
+                    send_stats()
+                    conn.send(("flushed",))
+                elif cmd[0] == "stop":
+                    return
+
+            item = ring.read(timeout=0.05)
+            if item is None:
+                send_stats() # Idle: report whatever is left over
+                continue
+            if decoder is None:
+                continue
+            data, captured = item
+            decode(data)
+            # Decode timings go back in batches, not per chunk
+            if stats[2] >= 8:
+                send_stats()
+    except (EOFError, OSError):
+        pass # Parent went away
+    finally:
+        ring.close()
+
+class ProcessDecoder:
+    """Parent-side handle of the decoder worker process.
+
+    `feed()` never blocks the capture thread; results are delivered to
+    `on_result(text, is_final, captured)` from a background reader thread.
+    """
+
+    def __init__(self, sample_rate=16000, model_cache_bytes=1024 * 1024 * 1024, partial_interval=0.12):
+        self.on_result = None
+        self.on_stats = None # Callback(decode_seconds, audio_seconds, chunks)
+        self.ring = PcmRing()
+        self.conn, child_conn = _ctx.Pipe()
+        self.process = _ctx.Process(target=_worker_main,
+                                    args=(self.ring.handle(), child_conn, sample_rate, model_cache_bytes,
+                                          partial_interval),
+                                    name="textream-decoder", daemon=True)
+        self.process.start()
+        child_conn.close()
+
+        self._loaded = threading.Event()
+        self._load_error = None
+        self._flushed = threading.Event()
+        self._send_lock = threading.Lock() # Commands come from the UI, reader and audio threads
+        self._reader = threading.Thread(target=self._read_results, daemon=True)
+        self._reader.start()
+
+    @property
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def load_model(self, lang_code, model_path, timeout=120.0):
+        """Asks the worker to load a model and waits for it. Returns True on success."""
+        self._loaded.clear()
+        self._load_error = None
+        self._send(("load", lang_code, model_path))
+        if not self._loaded.wait(timeout):
+            self._load_error = "timed out"
+        if self._load_error:
+            print(f"Decoder process failed to load model: {self._load_error}")
+            return False
+        return True
+
+    def preload(self, lang_code, model_path):
+        """Loads a model into the worker's cache in the background without switching to it."""
+        self._send(("preload", lang_code, model_path))
+
+    def set_grammar(self, phrases):
+        """Rebuilds the worker's recognizer with a phrase list (None for free speech)."""
+        self._send(("grammar", phrases))
+
+    def set_profile(self, level):
+        """Switches the worker's decoder to DECODE_PROFILES[level]."""
+        self._send(("profile", level))
+
+    def feed(self, data, block=False, captured=0.0):
+        return self.ring.write(data, block, captured)
+
+    def queue_depth(self):
+        return self.ring.depth()
+
+    def flush(self, timeout=30.0):
+        """Waits until the worker has decoded everything queued and delivered its final result."""
+        self._flushed.clear()
+        self._send(("flush",))
+        self._flushed.wait(timeout)
+
+    def close(self):
+        try:
+            self._send(("stop",))
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=2.0)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+        self.ring.close()
+
+    def _send(self, cmd):
+        with self._send_lock:
+            self.conn.send(cmd)
+
+    def _read_results(self):
+        while True:
+            try:
+                msg = self.conn.recv()
+            except (EOFError, OSError):
+                break
+            if msg[0] == "result":
+                if self.on_result:
+                    self.on_result(*msg[1:])
+            elif msg[0] == "loaded":
+                self._load_error = msg[1]
+                self._loaded.set()
+            elif msg[0] == "stats":
+                if self.on_stats:
+                    self.on_stats(*msg[1:])
+            elif msg[0] == "flushed":
+                self._flushed.set()
+        # Worker exited: unblock anyone waiting on it
+        self._load_error = self._load_error or "decoder process exited"
+        self._loaded.set()
+        self._flushed.set()
@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import deque
+
+class EngineMetrics:
+    """Health counters of the audio pipeline.
+
+    The reader thread (or the decoder process, via its stats messages) records
+    into it; anyone may call `snapshot()` to poll or log the current state.
+    """
+
+    def __init__(self, window_seconds=10.0):
+        self.window_seconds = window_seconds # Audio covered by the rolling real-time factor
+        self._lock = threading.Lock()
+        self._window = deque() # (decode_seconds, audio_seconds)
+        self._window_decode = 0.0
+        self._window_audio = 0.0
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._window.clear()
+            self._window_decode = 0.0
+            self._window_audio = 0.0
+            self.started = time.monotonic()
+            self.chunks = 0
+            self.audio_seconds = 0.0
+            self.decode_seconds = 0.0
+            self.last_decode_ms = 0.0
+            self.max_decode_ms = 0.0
+            self.overruns = 0     # Input buffer overflows reported by the device
+            self.dropped = 0      # Chunks dropped because decoding fell behind
+            self.queue_depth = 0  # Audio waiting to be read/decoded, in chunks
+            self.restarts = 0     # Times the reader loop was restarted after an error
+            self.last_error = None
+            self.profile = "full" # Current decoder profile (see decoder.DECODE_PROFILES)
+
+    def record_decode(self, decode_seconds, audio_seconds, chunks=1):
+        """Adds decode time for `chunks` chunks holding `audio_seconds` of audio."""
+        with self._lock:
+            self.chunks += chunks
+            self.audio_seconds += audio_seconds
+            self.decode_seconds += decode_seconds
+            self.last_decode_ms = decode_seconds / chunks * 1000
+            self.max_decode_ms = max(self.max_decode_ms, self.last_decode_ms)
+
+            self._window.append((decode_seconds, audio_seconds))
+            self._window_decode += decode_seconds
+            self._window_audio += audio_seconds
+            while len(self._window) > 1 and self._window_audio - self._window[0][1] >= self.window_seconds:
+                old_decode, old_audio = self._window.popleft()
+                self._window_decode -= old_decode
+                self._window_audio -= old_audio
+
+    def clear_window(self):
+        """Forgets the rolling window, e.g. after changing something that affects decode speed."""
+        with self._lock:
+            self._window.clear()
+            self._window_decode = 0.0
+            self._window_audio = 0.0
+
+    @property
+    def window_audio_seconds(self):
+        with self._lock:
+            return self._window_audio
+
+    def record_error(self, error):
+        with self._lock:
+            self.restarts += 1
+            self.last_error = str(error)
+
+    @property
+    def real_time_factor(self):
+        """Decode time per second of audio over the rolling window; above 1 means falling behind."""
+        with self._lock:
+            return self._window_decode / self._window_audio if self._window_audio else 0.0
+
+    def snapshot(self):
+        rtf = self.real_time_factor
+        with self._lock:
+            return {
+                "uptime_s": round(time.monotonic() - self.started, 1),
+                "chunks": self.chunks,
+                "audio_s": round(self.audio_seconds, 2),
+                "decode_ms_avg": round(self.decode_seconds / self.chunks * 1000, 2) if self.chunks else 0.0,
+                "decode_ms_last": round(self.last_decode_ms, 2),
+                "decode_ms_max": round(self.max_decode_ms, 2),
+                "rtf": round(rtf, 3),
+                "overruns": self.overruns,
+                "dropped": self.dropped,
+                "queue_depth": self.queue_depth,
+                "restarts": self.restarts,
+                "last_error": self.last_error,
+                "profile": self.profile,
+            }
+
+    def describe(self):
+        s = self.snapshot()
+        return (f"RTF {s['rtf']:.2f} | decode {s['decode_ms_avg']:.1f} ms avg, {s['decode_ms_max']:.1f} ms max | "
+                f"overruns {s['overruns']} | dropped {s['dropped']} | queue {s['queue_depth']} | restarts {s['restarts']} | profile {s['profile']}")
@@ -1,4 +1,6 @@
 import math
+from bisect import bisect_right
+from itertools import accumulate
 
 def normalize(text: str) -> str:
     """Normalize text: lowercase and keep only letters, numbers, and whitespace."""
@@ -7,22 +9,44 @@ def normalize(text: str) -> str:
 class FuzzyMatcher:
     def __init__(self):
         self.source_text = ""
-        self.normalized_source = ""
+        self._normalized_source = ""
         self.match_start_offset = 0
         self.recognized_char_count = 0
+        self.spoken_char_count = 0 # Furthest point speech matched; recognized_char_count may be ahead (seek())
+        self.word_starts = [] # Char offset of each word in source_text
 
     def set_text(self, text: str):
         """Initialize with new script text."""
         # Simple cleanup of lines
         self.source_text = " ".join(text.split())
-        self.normalized_source = normalize(self.source_text)
+        self._normalized_source = None # Built on first use; slow for multi-MB scripts
         self.match_start_offset = 0
         self.recognized_char_count = 0
+        self.spoken_char_count = 0
+
+        # Words are separated by single spaces after the cleanup above
+        words = self.source_text.split(" ") if self.source_text else []
+        self.word_starts = list(accumulate([len(word) + 1 for word in words[:-1]], initial=0)) if words else []
+
+    @property
+    def normalized_source(self) -> str:
+        if self._normalized_source is None:
+            self._normalized_source = normalize(self.source_text)
+        return self._normalized_source
+
+    def word_index_at(self, char_offset: int) -> int:
+        """Index of the word containing (or just before) `char_offset`."""
+        return max(0, bisect_right(self.word_starts, char_offset) - 1)
 
     def jump_to(self, char_offset: int):
         """Manual jump to position."""
         self.recognized_char_count = max(0, min(char_offset, len(self.source_text)))
         self.match_start_offset = self.recognized_char_count
+        self.spoken_char_count = self.recognized_char_count
+
+    def seek(self, char_offset: int):
+        """Moves the shown position only; matching continues from the same anchor."""
+        self.recognized_char_count = max(0, min(char_offset, len(self.source_text)))
 
     def get_prev_word_offset(self) -> int:
         """Find the start of the previous word."""
@@ -66,6 +90,7 @@ class FuzzyMatcher:
         best_match = max(char_result, word_result)
         
         new_count = self.match_start_offset + best_match
+        self.spoken_char_count = max(self.spoken_char_count, min(new_count, len(self.source_text)))
         
         # NEVER MOVE BACKWARDS
         if new_count > self.recognized_char_count:
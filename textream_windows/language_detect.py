@@ -0,0 +1,49 @@
+from fuzzy_matcher import normalize
+
+# A handful of very frequent words per supported language
+STOPWORDS = {
+    "tr": {"ve", "bir", "bu", "da", "de", "için", "ile", "çok", "ama", "gibi", "daha", "olarak", "ben", "sen", "biz", "ne", "mi", "değil", "var", "yok"},
+    "en": {"the", "and", "of", "to", "is", "in", "that", "it", "you", "for", "with", "this", "are", "was", "we", "on", "be", "have", "not", "your"},
+    "es": {"el", "la", "de", "que", "y", "en", "los", "las", "por", "con", "para", "una", "es", "su", "al", "lo", "como", "más", "pero", "del"},
+    "fr": {"le", "la", "les", "de", "des", "et", "est", "un", "une", "que", "pour", "dans", "pas", "qui", "sur", "vous", "nous", "avec", "ce", "du"},
+    "de": {"der", "die", "das", "und", "ist", "nicht", "ein", "eine", "zu", "den", "mit", "sich", "auf", "für", "ich", "sie", "wir", "auch", "es", "dem"},
+}
+
+# Letters that (among our languages) practically only one language uses
+MARKERS = {
+    "tr": set("ğışİı"),
+    "de": set("ßä"), # ö and ü are Turkish too
+    "es": set("ñ¿¡"),
+    "fr": set("èêàùœ"), # ç is Turkish too
+}
+
+def detect_language(text, sample_chars=4000):
+    """Best guess of the script's language code, or None if there isn't enough signal.
+
+    Only looks at the first `sample_chars` characters so it stays cheap for
+    very long scripts.
+    """
+    sample = text[:sample_chars]
+    if not sample.strip():
+        return None
+
+    # Han characters decide it outright
+    han = sum(1 for c in sample if "一" <= c <= "鿿")
+    if han > len(sample) * 0.2:
+        return "cn"
+
+    scores = dict.fromkeys(STOPWORDS, 0)
+    words = normalize(sample).split()
+    for word in words:
+        for lang, stopwords in STOPWORDS.items():
+            if word in stopwords:
+                scores[lang] += 1
+    lowered = sample.lower()
+    for lang, letters in MARKERS.items():
+        scores[lang] += 2 * sum(1 for c in lowered if c in letters)
+
+    best = max(scores, key=scores.get)
+    # Require a few hits so a single ambiguous word doesn't decide it
+    if scores[best] < max(3, len(words) // 50):
+        return None
+    return best
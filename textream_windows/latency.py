@@ -0,0 +1,98 @@
+"""End-to-end latency tracing from audio capture to the highlighted text.
+
+Each chunk is stamped with `time.perf_counter()` when it is read from the
+source. Results carry the stamp of the chunk that produced them, and the UI
+records when each stage finished:
+
+    decode    capture -> result leaves the recognizer (includes ring queueing in process mode)
+    dispatch  result emitted -> Qt slot runs on the UI thread
+    match     FuzzyMatcher.match()
+    render    match -> the overlay paints the new position (see painted()); results
+              that don't move the position end when the listeners return
+    total     capture -> render finished
+
+perf_counter is system-wide on Windows (QueryPerformanceCounter) and Linux
+(CLOCK_MONOTONIC), so stamps from the decoder process compare directly.
+"""
+import csv
+import time
+from collections import deque
+
+STAGES = ("decode", "dispatch", "match", "render", "total")
+BUCKETS_MS = (5, 10, 20, 50, 100, 200, 500, 1000) # Histogram upper edges; the last bucket is open
+
+class LatencyTracer:
+    """Keeps the last `window` samples per stage and optionally appends every trace to a CSV file."""
+
+    def __init__(self, window=500, csv_path=None):
+        self.samples = {stage: deque(maxlen=window) for stage in STAGES}
+        self.count = 0
+        self.paint_stamps = False # Set when a display calls painted(); moves then end at that paint
+        self._pending = deque(maxlen=16) # Traces waiting for their paint (bounded while nothing is shown)
+        self._csv_file = None
+        self._csv = None
+        if csv_path:
+            self._csv_file = open(csv_path, "w", newline="")
+            self._csv = csv.writer(self._csv_file)
+            self._csv.writerow(["seq", "is_final", "captured"] + [f"{stage}_ms" for stage in STAGES])
+
+    def record(self, is_final, captured, emitted, received, matched, rendered):
+        """Adds one trace; all arguments after `is_final` are perf_counter() stamps."""
+        ms = {
+            "decode": (emitted - captured) * 1000,
+            "dispatch": (received - emitted) * 1000,
+            "match": (matched - received) * 1000,
+            "render": (rendered - matched) * 1000,
+            "total": (rendered - captured) * 1000,
+        }
+        for stage, value in ms.items():
+            self.samples[stage].append(value)
+        self.count += 1
+        if self._csv:
+            self._csv.writerow([self.count, int(is_final), f"{captured:.6f}"] + [f"{ms[stage]:.3f}" for stage in STAGES])
+            if self.count % 50 == 0:
+                self._csv_file.flush()
+
+    def begin(self, is_final, captured, emitted, received, matched):
+        """Holds a trace until the next painted() call stamps its render stage."""
+        self._pending.append((is_final, captured, emitted, received, matched))
+
+    def painted(self, rendered=None):
+        """Display callback after a paint that drew a new position; finishes the pending traces."""
+        rendered = time.perf_counter() if rendered is None else rendered
+        while self._pending:
+            self.record(*self._pending.popleft(), rendered)
+
+    def percentile(self, stage, q):
+        values = sorted(self.samples[stage])
+        if not values:
+            return 0.0
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    def histogram(self, stage):
+        """Counts per BUCKETS_MS bucket over the rolling window (one extra bucket for anything slower)."""
+        counts = [0] * (len(BUCKETS_MS) + 1)
+        for value in self.samples[stage]:
+            for i, edge in enumerate(BUCKETS_MS):
+                if value <= edge:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+        return counts
+
+    def describe_histogram(self, stage="total"):
+        """One line of histogram() counts, e.g. "<=5 ms 12 | <=10 ms 30 | ... | >1000 ms 0"."""
+        labels = [f"<={edge} ms" for edge in BUCKETS_MS] + [f">{BUCKETS_MS[-1]} ms"]
+        return " | ".join(f"{label} {count}" for label, count in zip(labels, self.histogram(stage)))
+
+    def describe(self, sep=" | "):
+        """p50/p95 per stage in milliseconds."""
+        return sep.join(f"{stage} {self.percentile(stage, 0.5):.0f}/{self.percentile(stage, 0.95):.0f} ms"
+                        for stage in STAGES)
+
+    def close(self):
+        if self._csv_file:
+            self._csv_file.close()
+            self._csv_file = None
+            self._csv = None
@@ -4,6 +4,7 @@ TRANSLATIONS = {
         "editor_title": "Textream",
         "placeholder": "Senaryonuzu buraya yapıştırın...",
         "start_btn": "Stüdyoyu Başlat",
+        "model_loading": "Model yükleniyor...",
         "settings_title": "Hızlı Ayarlar",
         "lang_label": "Diksiyon Dili:",
         "theme_label": "Görünüm Teması:",
@@ -49,6 +50,7 @@ TRANSLATIONS = {
         "editor_title": "Textream",
         "placeholder": "Paste your script here...",
         "start_btn": "Start Studio",
+        "model_loading": "Loading model...",
         "settings_title": "Quick Settings",
         "lang_label": "Recognition Language:",
         "theme_label": "UI Theme:",
@@ -94,6 +96,7 @@ TRANSLATIONS = {
         "editor_title": "Textream",
         "placeholder": "Pegue su guión aquí...",
         "start_btn": "Iniciar Estudio",
+        "model_loading": "Cargando modelo...",
         "settings_title": "Ajustes Rápidos",
         "lang_label": "Idioma de reconocimiento:",
         "theme_label": "Tema de la interfaz:",
@@ -139,6 +142,7 @@ TRANSLATIONS = {
         "editor_title": "Textream",
         "placeholder": "Collez votre script ici...",
         "start_btn": "Démarrer le Studio",
+        "model_loading": "Chargement du modèle...",
         "settings_title": "Paramètres Rapides",
         "lang_label": "Langue de reconnaissance:",
         "theme_label": "Thème de l'interface:",
@@ -184,6 +188,7 @@ TRANSLATIONS = {
         "editor_title": "Textream",
         "placeholder": "Skript hier einfügen...",
         "start_btn": "Studio Starten",
+        "model_loading": "Modell wird geladen...",
         "settings_title": "Schnelleinstellungen",
         "lang_label": "Erkennungssprache:",
         "theme_label": "UI-Design:",
@@ -229,6 +234,7 @@ TRANSLATIONS = {
         "editor_title": "Textream",
         "placeholder": "在此粘贴您的剧本...",
         "start_btn": "启动工作室",
+        "model_loading": "正在加载模型...",
         "settings_title": "快速设置",
         "lang_label": "识别语言:",
         "theme_label": "界面主题:",
@@ -1,7 +1,11 @@
+import time
+_STARTED = time.perf_counter() # Before any import, for --profile-startup
 import sys
 import os
 import json
+import argparse
 import threading
+import multiprocessing
 from PyQt6.QtWidgets import QApplication, QMessageBox
 from PyQt6.QtGui import QIcon
 from PyQt6.QtCore import QObject, pyqtSignal, Qt, QTimer
@@ -9,11 +13,10 @@ from PyQt6.QtCore import QObject, pyqtSignal, Qt, QTimer
 # Add current directory to path so imports work
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from ui.overlay_window import OverlayWindow
+# Only what the setup window needs; the engine, vosk and the overlay are
+# imported once the window is up (see main())
 from ui.main_window import MainWindow
-from audio_engine import AudioEngine
-from fuzzy_matcher import FuzzyMatcher
-from download_model import download_language, MODELS 
+from settings import settings
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -28,19 +31,40 @@ SAMPLE_TEXTS = {
 
 class Bridge(QObject):
     """Bridge between background Audio thread and Main UI thread."""
-    result_received = pyqtSignal(str, bool) # text, is_final
-    audio_level_received = pyqtSignal(float)
+    result_received = pyqtSignal(str, bool, float, float) # text, is_final, captured, emitted (perf_counter)
     model_loaded = pyqtSignal(bool)
+    model_state_changed = pyqtSignal(str, str) # lang_code, "loading" | "ready" | "failed" | "missing"
     error_occurred = pyqtSignal(str)
+    remote_command = pyqtSignal(dict) # From position server clients
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Textream Windows")
+    parser.add_argument("--latency-csv", metavar="PATH", help="append a latency trace per recognized result to PATH")
+    parser.add_argument("--debug-hud", action="store_true", help="show latency and decoder stats on the overlay")
+    parser.add_argument("--serve", metavar="PORT", type=int, nargs="?", const=8765,
+                        help="broadcast positions to other displays on localhost:PORT (default 8765)")
+    parser.add_argument("--profile-startup", action="store_true", help="print how long each startup phase took")
+    return parser.parse_known_args() # Anything else is left for Qt
 
 def main():
+    multiprocessing.freeze_support() # Decoder worker process in frozen builds
+    args, qt_args = parse_args()
+    phases = [] # (name, seconds) for --profile-startup
+    phase_start = [_STARTED]
+
+    def phase(name):
+        now = time.perf_counter()
+        phases.append((name, now - phase_start[0]))
+        phase_start[0] = now
+
     # Fix for Windows Taskbar/Task Manager icon grouping
     if sys.platform == 'win32':
         import ctypes
         myappid = 'fka.textream.windows.1.0' # arbitrary string
         ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID(myappid)
+    phase("imports")
 
-    app = QApplication(sys.argv)
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setApplicationName("Textream Windows")
     
     # Set official icon from the project assets
@@ -50,25 +74,75 @@ def main():
     if os.path.exists(icon_path):
         app_icon = QIcon(icon_path)
         app.setWindowIcon(app_icon)
+    phase("qt init")
     
-    # 1. Initialize Components
-    matcher = FuzzyMatcher()
+    # 1. Show the setup window first, everything else loads behind it
     main_window = MainWindow()
     if app_icon:
         main_window.setWindowIcon(app_icon)
-    overlay_window = OverlayWindow()
-    if app_icon:
-        overlay_window.setWindowIcon(app_icon)
+    main_window.show()
+    app.processEvents() # Paint it now rather than after the rest of startup
+    phase("setup window")
 
-    # Setup Audio
-    audio = AudioEngine()
+    # Setup Audio (vosk itself is imported with the first model load, PyAudio when capture starts)
+    from audio_engine import AudioEngine
+    from session import TeleprompterSession
+    from auto_scroll import AutoScroller, SPEED_LEVELS_WPM
+    from latency import LatencyTracer
+    phase("engine imports")
+    audio = AudioEngine(use_process=settings.decode_in_process,
+                        model_cache_bytes=settings.model_cache_mb * 1024 * 1024,
+                        partial_interval=settings.partial_interval_ms / 1000)
     bridge = Bridge()
-    
-    # Show main setup window first
-    main_window.show()
+    session = TeleprompterSession(engine=audio, tracer=LatencyTracer(csv_path=args.latency_csv))
+    scroller = AutoScroller(session, follow_voice=True) # Mic starts on
+    tracer = session.tracer
+    phase("engine")
+
+    # --- Overlay, built on first use (usually Start) ---
+    overlay_group = [None]
+
+    def get_overlays():
+        if overlay_group[0] is None:
+            started = time.perf_counter()
+            from ui.overlay_window import OverlayWindow
+            from ui.overlay_group import OverlayGroup
+            overlay_window = OverlayWindow()
+            if app_icon:
+                overlay_window.setWindowIcon(app_icon)
+            # Mirror overlays on other screens follow the same position
+            overlays = OverlayGroup.from_settings(overlay_window, settings.extra_overlays)
+            session.listeners.append(overlays.on_position)
+            # The latency trace's render stage ends when the primary overlay paints the new offset
+            overlay_window.prompter.script_view.on_painted = tracer.painted
+            tracer.paint_stamps = True
+
+            # Mirrors with show_controls drive the same session; the primary's timer alone ticks auto-advance
+            overlay_window.prompter.auto_advance_requested.connect(on_auto_advance)
+            for overlay in overlays.controlled():
+                overlay.prompter.pause_requested.connect(on_pause_requested)
+                overlay.prompter.mic_toggled.connect(on_mic_toggled)
+                overlay.prompter.rewind_requested.connect(on_rewind_requested)
+                overlay.prompter.forward_requested.connect(on_forward_requested)
+                overlay.prompter.speed_changed.connect(on_speed_changed)
+            for overlay in overlays.overlays:
+                # When user changes language from overlay menu, we DO want to load sample text
+                overlay.prompter.language_changed.connect(lambda l: on_language_change_requested(l, load_sample=True))
+                overlay.language_changed.connect(lambda l: on_language_change_requested(l, load_sample=True))
+            overlay_group[0] = overlays
+            if args.profile_startup:
+                print(f"Startup profile: overlay built on demand in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return overlay_group[0]
+
+    def get_overlay_window():
+        return get_overlays().primary
+
+    def dialog_parent():
+        return overlay_group[0].primary if overlay_group[0] else main_window
 
     # --- Background Model Pre-download ---
     def background_download_all_models():
+        from download_model import download_language, MODELS
         print("Checking/Downloading all models in background...")
         for lang in MODELS:
             if not os.path.exists(os.path.join(BASE_DIR, "models", lang)):
@@ -82,33 +156,76 @@ def main():
     
     # --- Callbacks & Signals ---
     
-    def on_audio_level(level):
-        bridge.audio_level_received.emit(level)
-        
-    def on_audio_result(text, is_final):
-        bridge.result_received.emit(text, is_final)
+    # Results arrive on the audio thread; matching and drawing happen on the UI thread
+    def on_audio_result(text, is_final, captured):
+        bridge.result_received.emit(text, is_final, captured, time.perf_counter())
 
-    audio.on_audio_level = on_audio_level
     audio.on_result = on_audio_result
+
+    # --- Audio Level Meter ---
+    # The engine only aggregates the peak level; we pull it at the display
+    # rate so there is no per-chunk signal traffic or repaint.
+    meter_timer = QTimer()
+    meter_timer.setTimerType(Qt.TimerType.PreciseTimer)
+    refresh_hz = app.primaryScreen().refreshRate() or 60
+    meter_timer.setInterval(max(1, round(1000 / min(settings.meter_fps, refresh_hz))))
+    meter_timer.timeout.connect(lambda: get_overlays().update_audio(audio.take_level()))
+
+    def sync_meter():
+        # Only tick while the mic is actually live
+        active = audio.is_running and not audio.is_paused and audio.is_mic_active
+        if active and not meter_timer.isActive():
+            audio.take_level() # Drop whatever accumulated while idle
+            meter_timer.start()
+        elif not active and meter_timer.isActive():
+            meter_timer.stop()
+            if overlay_group[0]:
+                overlay_group[0].sync_controls(lambda prompter: prompter.waveform.reset())
     
-    def on_result(text, is_final):
+    def on_result(text, is_final, captured, emitted):
         if not text.strip(): return
-        
-        # Match current text
-        char_count = matcher.match(text)
-        overlay_window.update_progress(char_count)
-        
-        print(f"[{'FINAL' if is_final else 'PARTIAL'}] Spoken: {text} | Pos: {char_count}")
-
-        # Only update the starting anchor when a sentence is fully finished
+        session.handle_result(text, is_final, captured, emitted)
+        print(f"[{'FINAL' if is_final else 'PARTIAL'}] Spoken: {text} | Pos: {session.offset}")
         if is_final:
-            matcher.match_start_offset = matcher.recognized_char_count
-            print(f"Anchor moved to: {matcher.match_start_offset}")
+            print(f"Anchor moved to: {session.matcher.match_start_offset}")
 
     bridge.result_received.connect(on_result)
-    bridge.audio_level_received.connect(overlay_window.update_audio)
-    
 
+    # --- Position Broadcast ---
+    server = None
+    if args.serve is not None:
+        from position_server import PositionServer, apply_command
+
+        def on_remote_command(cmd):
+            # Pause goes through the overlay so its button stays in sync
+            if cmd["cmd"] in ("pause", "resume") and overlay_group[0]:
+                overlay_group[0].primary.prompter.set_paused(cmd["cmd"] == "pause")
+            else:
+                apply_command(session, cmd)
+
+        server = PositionServer(port=args.serve)
+        server.on_command = bridge.remote_command.emit
+        bridge.remote_command.connect(on_remote_command)
+        try:
+            server.start()
+            session.listeners.append(server.publish)
+            server.publish(session.position())
+        except OSError as e:
+            print(f"Position server could not start: {e}")
+            server = None
+
+    # --- Debug HUD ---
+    if args.debug_hud:
+        def refresh_hud():
+            if not overlay_group[0]:
+                return
+            overlay_window = overlay_group[0].primary
+            m = audio.metrics
+            overlay_window.set_debug_text(f"{tracer.describe(sep=chr(10))}\nRTF {m.real_time_factor:.2f} ({m.profile})\n"
+                                          f"backdrop {overlay_window.paint_ms:.2f} ms, {overlay_window.paint_area:.0%} of window")
+        hud_timer = QTimer()
+        hud_timer.timeout.connect(refresh_hud)
+        hud_timer.start(500)
     
     # --- Controls & Navigation ---
     current_requested_lang = [None] # Mutable container
@@ -118,12 +235,12 @@ def main():
             print(f"Download finished. Loading {current_requested_lang[0]}...")
             # Re-call on_language_change_requested to load the now-present model
             on_language_change_requested(current_requested_lang[0])
-            overlay_window.set_text(f"Dil İndirildi: {current_requested_lang[0]}. Başlatılıyor...")
+            get_overlay_window().set_text(f"Dil İndirildi: {current_requested_lang[0]}. Başlatılıyor...")
         else:
-            overlay_window.set_text("İndirme sırasında bir hata oluştu veya iptal edildi.")
+            get_overlay_window().set_text("İndirme sırasında bir hata oluştu veya iptal edildi.")
 
     def on_bridge_error(msg):
-        QMessageBox.warning(overlay_window, "Hata", msg)
+        QMessageBox.warning(dialog_parent(), "Hata", msg)
 
     bridge.model_loaded.connect(on_model_downloaded)
     bridge.error_occurred.connect(on_bridge_error)
@@ -135,36 +252,72 @@ def main():
         else:
             audio.resume()
             print("Audio processing RESUMED")
+        if overlay_group[0]: # Keep every overlay's button in step
+            overlay_group[0].sync_controls(lambda prompter: prompter.set_paused(is_paused))
+        sync_meter()
 
     def on_mic_toggled(is_on):
         audio.set_mic_enabled(is_on)
+        scroller.follow_voice = is_on # Without speech, auto-advance runs freely
+        if overlay_group[0]:
+            overlay_group[0].sync_controls(lambda prompter: prompter.set_mic_on(is_on))
+        sync_meter()
         print(f"Microphone {'ENABLED' if is_on else 'DISABLED'}")
 
     def on_rewind_requested():
         # Jump back by one word
-        new_pos = matcher.get_prev_word_offset()
-        matcher.jump_to(new_pos)
-        overlay_window.update_progress(new_pos)
-        print(f"Rewind: Jumped to {new_pos}")
+        session.rewind()
+        print(f"Rewind: Jumped to {session.offset}")
 
     def on_forward_requested():
         # Jump forward by one word
-        new_pos = matcher.get_next_word_offset()
-        matcher.jump_to(new_pos)
-        overlay_window.update_progress(new_pos)
-        print(f"Forward: Jumped to {new_pos}")
+        session.forward()
+        print(f"Forward: Jumped to {session.offset}")
 
     def on_auto_advance():
-        # Advance by 1 character (timer determines frequency)
-        new_pos = min(len(matcher.source_text), matcher.recognized_char_count + 1)
-        matcher.jump_to(new_pos)
-        overlay_window.update_progress(new_pos)
+        # Once per frame; the scroller moves by elapsed time at the chosen WPM
+        scroller.tick()
+
+    def on_speed_changed(level):
+        scroller.set_wpm(SPEED_LEVELS_WPM[level])
+        if overlay_group[0]:
+            overlay_group[0].sync_controls(lambda prompter: prompter.set_speed(level))
+        print(f"Auto-advance: {scroller.wpm} WPM" if scroller.wpm else "Auto-advance: OFF")
+
+    # --- Model Loading ---
+    pending_activation = [None] # (lang_code, load_sample) to start once its model is ready
+
+    def request_model(lang_code):
+        """Loads a model off the UI thread; progress is reported through the bridge."""
+        if not audio.model_path_for(lang_code):
+            bridge.model_state_changed.emit(lang_code, "missing")
+            return
+        bridge.model_state_changed.emit(lang_code, "loading")
+        audio.load_model_async(lang_code, lambda lang, ok: bridge.model_state_changed.emit(lang, "ready" if ok else "failed"))
+
+    def on_model_state_changed(lang_code, state):
+        print(f"Model {lang_code}: {state}")
+        main_window.set_model_state(lang_code, state)
+        if state == "loading" or not pending_activation[0] or pending_activation[0][0] != lang_code:
+            return
+        _, load_sample = pending_activation[0]
+        pending_activation[0] = None
+        if state == "ready":
+            activate_language(lang_code, load_sample)
+        else:
+            QMessageBox.critical(dialog_parent(), "Hata", f"{lang_code} dili yüklenemedi.")
+
+    bridge.model_state_changed.connect(on_model_state_changed)
+    main_window.language_selected.connect(request_model)
+    main_window.script_language_detected.connect(audio.preload_async)
 
     # --- Language Change ---
     def on_language_change_requested(lang_code, load_sample=True):
         print(f"Switching language to: {lang_code}")
         current_requested_lang[0] = lang_code
-        overlay_window.current_language = lang_code # Update UI state
+        settings.last_language = lang_code # Preloaded on next startup
+        session.lang = lang_code
+        get_overlay_window().current_language = lang_code # Update UI state
         
         # Check if model exists
         model_path = os.path.join(BASE_DIR, "models", lang_code)
@@ -172,13 +325,14 @@ def main():
         
         if not os.path.exists(model_path) and not (lang_code == 'tr' and os.path.exists(legacy_path)):
             # Ask user to download
-            reply = QMessageBox.question(overlay_window, "Model Eksik", 
+            reply = QMessageBox.question(dialog_parent(), "Model Eksik", 
                                         f"'{lang_code}' dili için gerekli dosyalar yüklü değil.\nŞimdi indirmek ister misiniz?",
                                         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
             
             if reply == QMessageBox.StandardButton.Yes:
-                overlay_window.set_text(f"İndiriliyor: {lang_code}...\nLütfen bekleyin (Konsoldan takip edebilirsiniz).")
+                get_overlay_window().set_text(f"İndiriliyor: {lang_code}...\nLütfen bekleyin (Konsoldan takip edebilirsiniz).")
                 def download_worker():
+                    from download_model import download_language
                     success = download_language(lang_code, BASE_DIR)
                     bridge.model_loaded.emit(success)
 
@@ -187,59 +341,66 @@ def main():
             else:
                 return
 
-        # Restart Audio
-        audio.stop()
-        if audio.load_model(lang_code):
-            audio.start()
-            
-            # Load Sample Text ONLY if requested (e.g. user manually switched lang via menu)
-            if load_sample:
-                sample = SAMPLE_TEXTS.get(lang_code, SAMPLE_TEXTS["en"])
-                matcher.set_text(sample)
-                overlay_window.set_text(sample)
-                print(f"Sample text loaded for {lang_code}")
-        else:
-             QMessageBox.critical(overlay_window, "Hata", f"{lang_code} dili yüklenemedi.")
+        # The model loads in the background and is swapped in without
+        # reopening the microphone; audio starts once it's ready
+        pending_activation[0] = (lang_code, load_sample)
+        request_model(lang_code)
+
+    def activate_language(lang_code, load_sample):
+        audio.start() # No-op if already capturing
+        sync_meter()
+        
+        # Load Sample Text ONLY if requested (e.g. user manually switched lang via menu)
+        if load_sample:
+            sample = SAMPLE_TEXTS.get(lang_code, SAMPLE_TEXTS["en"])
+            get_overlays().set_text(sample)
+            session.set_script(sample)
+            print(f"Sample text loaded for {lang_code}")
 
     def on_start_requested_wrapper(text, lang_code):
         main_window.hide()
-        matcher.set_text(text)
-        overlay_window.set_text(text)
-        overlay_window.show()
+        overlays = get_overlays()
+        overlays.set_text(text)
+        session.set_script(text)
+        overlays.show()
         
         # Load the language selected in setup, but PRESERVE the text we just set
         on_language_change_requested(lang_code, load_sample=False)
 
     main_window.start_requested.connect(on_start_requested_wrapper)
 
-    overlay_window.prompter.pause_requested.connect(on_pause_requested)
-    overlay_window.prompter.mic_toggled.connect(on_mic_toggled)
-    overlay_window.prompter.rewind_requested.connect(on_rewind_requested)
-    overlay_window.prompter.forward_requested.connect(on_forward_requested)
-    overlay_window.prompter.auto_advance_requested.connect(on_auto_advance)
-    # When user changes language from overlay menu, we DO want to load sample text
-    overlay_window.prompter.language_changed.connect(lambda l: on_language_change_requested(l, load_sample=True))
-    overlay_window.language_changed.connect(lambda l: on_language_change_requested(l, load_sample=True))
-
     # Initial Load
-    # Try loading 'tr' by default or 'model'
-    legacy_model = os.path.join(BASE_DIR, "model")
-    models_dir = os.path.join(BASE_DIR, "models")
-    
-    if os.path.exists(legacy_model) or os.path.exists(os.path.join(models_dir, "tr")):
-        audio.load_model("tr")
-        # Don't start audio yet, wait for user to hit Start in main_window
-    else:
-        # Try finding any model in models/
-        if os.path.exists(models_dir):
-            avail = [d for d in os.listdir(models_dir) if os.path.isdir(os.path.join(models_dir, d))]
-            if avail:
-                audio.load_model(avail[0])
+    # Warm the last used language in the background; the window is already up
+    # and Start is enabled as soon as it's ready.
+    # Falls back to Turkish, then to whatever model is installed
+    startup_lang = settings.last_language
+    if not audio.model_path_for(startup_lang):
+        models_dir = os.path.join(BASE_DIR, "models")
+        avail = sorted(d for d in os.listdir(models_dir) if os.path.isdir(os.path.join(models_dir, d))) if os.path.isdir(models_dir) else []
+        startup_lang = "tr" if audio.model_path_for("tr") else (avail[0] if avail else startup_lang)
+    request_model(startup_lang)
+    phase("wiring")
+
+    if args.profile_startup:
+        def report_startup():
+            phase("first event loop")
+            total = sum(seconds for _, seconds in phases)
+            print("Startup profile:")
+            for name, seconds in phases:
+                print(f"  {name:<18}{seconds * 1000:7.0f} ms")
+            print(f"  {'total':<18}{total * 1000:7.0f} ms")
+        QTimer.singleShot(0, report_startup)
 
     try:
         sys.exit(app.exec())
     finally:
-        audio.stop()
+        if tracer.count:
+            print(f"Latency (p50/p95 over last {len(tracer.samples['total'])} results): {tracer.describe()}")
+            print(f"Total latency histogram: {tracer.describe_histogram()}")
+        if server:
+            server.close()
+        session.close()
+        settings.flush()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,100 @@
+import os
+import threading
+from collections import OrderedDict
+
+def directory_size(path):
+    """Total size of the files under `path`; used as a stand-in for a model's memory footprint."""
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+class ModelCache:
+    """LRU cache of loaded Vosk models keyed by language code.
+
+    Switching back to a recently used language then only costs a new
+    KaldiRecognizer instead of reading the model from disk again. Least
+    recently used models are evicted once either limit is exceeded. The
+    pinned model (the one being decoded with) counts toward the limits but is
+    never evicted, so a preload can't push out the model in use; a preload
+    that doesn't fit next to it isn't kept. Without a pinned model the most
+    recent one is always kept.
+    """
+
+    def __init__(self, loader, max_models=3, max_bytes=1024 * 1024 * 1024):
+        self.loader = loader # Callable(model_path) -> model, e.g. vosk.Model
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict() # lang -> (model_path, model, size)
+        self.pinned = None # Language of the model in use
+        self._loading = {} # lang -> Event set when an in-flight load finishes
+        self._lock = threading.Lock()
+
+    def get(self, lang_code, model_path, pin=False):
+        """Returns the cached model for `lang_code`, loading it on a miss.
+
+        With `pin` it becomes the model in use, and the previously pinned one
+        is evictable again.
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(lang_code)
+                if entry and entry[0] == model_path:
+                    self._entries.move_to_end(lang_code)
+                    print(f"Model cache hit: {lang_code}")
+                    if pin:
+                        self.pinned = lang_code
+                        self._evict()
+                    return entry[1]
+                in_flight = self._loading.get(lang_code)
+                if not in_flight:
+                    in_flight = self._loading[lang_code] = threading.Event()
+                    break
+            # Someone else (e.g. a preload) is loading it already; wait and re-check
+            in_flight.wait()
+
+        try:
+            # Load outside the lock; this takes seconds
+            model = self.loader(model_path)
+            size = directory_size(model_path)
+            with self._lock:
+                self._entries[lang_code] = (model_path, model, size)
+                self._entries.move_to_end(lang_code)
+                if pin:
+                    self.pinned = lang_code
+                self._evict()
+            return model
+        finally:
+            with self._lock:
+                del self._loading[lang_code]
+            in_flight.set()
+
+    def __contains__(self, lang_code):
+        with self._lock:
+            return lang_code in self._entries
+
+    @property
+    def total_bytes(self):
+        with self._lock:
+            return sum(size for _path, _model, size in self._entries.values())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.pinned = None
+
+    def _evict(self):
+        total = sum(size for _path, _model, size in self._entries.values())
+        # Oldest first, never the pinned one (or, if none is, the most recent one)
+        candidates = list(self._entries) if self.pinned in self._entries else list(self._entries)[:-1]
+        candidates = [lang for lang in candidates if lang != self.pinned]
+        for lang_code in candidates:
+            if len(self._entries) <= self.max_models and total <= self.max_bytes:
+                break
+            _path, _model, size = self._entries.pop(lang_code)
+            total -= size
+            print(f"Model cache evicted: {lang_code}")
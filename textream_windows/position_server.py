@@ -0,0 +1,181 @@
+"""Localhost broadcast of script positions to other displays and show control.
+
+Clients connect over TCP and receive newline-delimited JSON, one position
+event per line (see session.TeleprompterSession):
+
+    {"seq":42,"offset":318,"word":57,"final":false}
+
+They may send commands back, one JSON object per line:
+
+    {"cmd":"jump","offset":120}   {"cmd":"jump","word":30}
+    {"cmd":"pause"}   {"cmd":"resume"}   {"cmd":"rewind"}   {"cmd":"forward"}
+
+Each client has its own bounded queue drained by its own thread; a client
+that can't keep up loses its oldest events (each carries the absolute
+position, so the latest one is enough) and never blocks the publisher.
+"""
+import json
+import queue
+import socket
+import threading
+
+COMMANDS = ("jump", "pause", "resume", "rewind", "forward")
+
+class _Client:
+    def __init__(self, server, sock, addr, queue_size):
+        self.server = server
+        self.sock = sock
+        self.addr = addr
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.closed = False
+
+    def start(self):
+        threading.Thread(target=self._write_loop, daemon=True).start()
+        threading.Thread(target=self._read_loop, daemon=True).start()
+
+    def send(self, line):
+        """Queues a line without ever blocking; drops the oldest one when full."""
+        while True:
+            try:
+                self.queue.put_nowait(line)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.send(None) # Wakes the writer
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        self.server._remove(self)
+
+    def _write_loop(self):
+        try:
+            while True:
+                line = self.queue.get()
+                if line is None or self.closed:
+                    break
+                self.sock.sendall(line)
+        except OSError:
+            pass
+        finally:
+            self.close()
+
+    def _read_loop(self):
+        try:
+            for raw in self.sock.makefile("rb"):
+                try:
+                    cmd = _validate(json.loads(raw))
+                except ValueError as e:
+                    self.send(_encode({"error": str(e)}))
+                    continue
+                self.server._dispatch(cmd)
+        except OSError:
+            pass
+        finally:
+            self.close()
+
+def _validate(cmd):
+    if not isinstance(cmd, dict) or cmd.get("cmd") not in COMMANDS:
+        raise ValueError(f"unknown command, expected one of {', '.join(COMMANDS)}")
+    if cmd["cmd"] == "jump":
+        target = cmd.get("word", cmd.get("offset"))
+        if not isinstance(target, int) or isinstance(target, bool):
+            raise ValueError("jump needs an integer 'offset' or 'word'")
+    return cmd
+
+def _encode(obj):
+    return (json.dumps(obj, separators=(",", ":")) + "\n").encode("utf-8")
+
+class PositionServer:
+    """Publishes position events to every connected client and relays their commands.
+
+    `on_command(cmd)` is called on the client's reader thread; route it to
+    the thread that owns the session if that matters (the GUI does).
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, queue_size=64):
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.on_command = None
+        self.clients = []
+        self._lock = threading.Lock()
+        self._last = None # Latest event line, sent to clients as they connect
+        self._sock = None
+
+    def start(self):
+        self._sock = socket.create_server((self.host, self.port))
+        self.port = self._sock.getsockname()[1] # In case port 0 picked a free one
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        print(f"Position server listening on {self.host}:{self.port}")
+
+    def publish(self, event):
+        line = _encode(event)
+        with self._lock:
+            self._last = line
+            clients = list(self.clients)
+        for client in clients:
+            client.send(line)
+
+    def close(self):
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+        with self._lock:
+            clients = list(self.clients)
+        for client in clients:
+            client.close()
+
+    def _accept_loop(self):
+        while self._sock:
+            try:
+                sock, addr = self._sock.accept()
+            except OSError:
+                break # Closed
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client = _Client(self, sock, addr, self.queue_size)
+            with self._lock:
+                self.clients.append(client)
+                last = self._last
+            if last:
+                client.send(last)
+            client.start()
+            print(f"Position client connected: {addr[0]}:{addr[1]}")
+
+    def _remove(self, client):
+        with self._lock:
+            if client in self.clients:
+                self.clients.remove(client)
+                print(f"Position client disconnected: {client.addr[0]}:{client.addr[1]} ({client.dropped} events dropped)")
+
+    def _dispatch(self, cmd):
+        if self.on_command:
+            self.on_command(cmd)
+
+def apply_command(session, cmd):
+    """Carries out a client command on a TeleprompterSession."""
+    name = cmd["cmd"]
+    if name == "jump":
+        if "word" in cmd:
+            session.jump_to_word(cmd["word"])
+        else:
+            session.jump_to(cmd["offset"])
+    elif name == "pause":
+        session.pause()
+    elif name == "resume":
+        session.resume()
+    elif name == "rewind":
+        session.rewind()
+    elif name == "forward":
+        session.forward()
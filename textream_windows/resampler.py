@@ -0,0 +1,111 @@
+"""Downmix and polyphase resampling of 16-bit PCM to the 16 kHz mono Vosk expects.
+
+Lets the microphone run at its native rate/channel count (e.g. 48 kHz stereo
+desks) instead of forcing the driver to resample.
+"""
+import time
+from math import gcd, ceil
+
+try:
+    import numpy as np
+except ImportError: # Optional: without numpy we capture at 16 kHz mono directly
+    np = None
+
+AVAILABLE = np is not None
+
+class Resampler:
+    """Streaming rational-ratio resampler with a windowed-sinc polyphase filter.
+
+    Buffers are allocated once per chunk size and reused; the per-chunk cost
+    is tracked so it can be reported.
+    """
+
+    def __init__(self, in_rate, in_channels, out_rate=16000, taps_per_ratio=16, rolloff=0.9):
+        if np is None:
+            raise RuntimeError("numpy is required for resampling")
+        self.in_rate = in_rate
+        self.in_channels = in_channels
+        self.out_rate = out_rate
+
+        g = gcd(in_rate, out_rate)
+        self.up = out_rate // g
+        self.down = in_rate // g
+
+        # Prototype low-pass at the upsampled rate, cut just below the lower Nyquist
+        self.taps = ceil(taps_per_ratio * max(1.0, self.down / self.up)) # Taps per phase
+        n = self.taps * self.up
+        cutoff = rolloff / (2 * max(self.up, self.down))
+        t = np.arange(n) - (n - 1) / 2
+        h = 2 * cutoff * np.sinc(2 * cutoff * t) * np.kaiser(n, 8.0)
+        h *= self.up / h.sum() # Unity gain after zero-stuffing
+
+        # phases[p, q] = h[p + q*up], reversed along q so a window of input dots straight into it
+        self.phases = np.ascontiguousarray(h.reshape(self.taps, self.up).T[:, ::-1], dtype=np.float32)
+
+        self._consumed = 0 # Input samples seen (relative, see _rebase)
+        self._next_out = 0 # Index of the next output sample
+        self._buf = np.zeros(self.taps - 1, dtype=np.float32) # History + current chunk
+        self._out = np.zeros(0, dtype=np.int16)
+
+        self.chunks = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def process(self, data):
+        """Converts one chunk of interleaved int16 PCM; returns 16-bit mono PCM bytes."""
+        started = time.perf_counter()
+        frames = len(data) // (2 * self.in_channels)
+        history = self.taps - 1
+        if len(self._buf) < history + frames:
+            grown = np.zeros(history + frames, dtype=np.float32)
+            grown[:history] = self._buf[:history]
+            self._buf = grown
+        buf = self._buf[:history + frames]
+
+        # Downmix straight into the reused buffer
+        samples = np.frombuffer(data, dtype=np.int16, count=frames * self.in_channels)
+        if self.in_channels == 1:
+            buf[history:] = samples
+        else:
+            np.mean(samples.reshape(frames, self.in_channels), axis=1, out=buf[history:])
+
+        # Output n needs input floor(n*down/up) and the taps-1 samples before it
+        end = -(-(self._consumed + frames) * self.up // self.down)
+        n = np.arange(self._next_out, end)
+        newest = n * self.down // self.up - (self._consumed - history)
+        windows = np.lib.stride_tricks.sliding_window_view(buf, self.taps)
+        y = np.einsum("ij,ij->i", windows[newest - history], self.phases[n * self.down % self.up])
+
+        if len(self._out) < len(y):
+            self._out = np.zeros(len(y), dtype=np.int16)
+        out = self._out[:len(y)]
+        np.clip(np.rint(y, out=y), -32768, 32767, out=y)
+        out[:] = y
+
+        # Keep the tail as history for the next chunk
+        buf[:history] = buf[frames:frames + history]
+        self._consumed += frames
+        self._next_out = end
+        self._rebase()
+
+        elapsed = time.perf_counter() - started
+        self.chunks += 1
+        self.total_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+        return out.tobytes()
+
+    def _rebase(self):
+        # Shift both counters by whole filter periods so they stay small
+        periods = self._next_out // self.up
+        self._next_out -= periods * self.up
+        self._consumed -= periods * self.down
+
+    def stats(self):
+        """Average/max cost per chunk in milliseconds."""
+        avg = self.total_seconds / self.chunks if self.chunks else 0.0
+        return {"chunks": self.chunks, "avg_ms": avg * 1000, "max_ms": self.max_seconds * 1000}
+
+    def describe(self):
+        s = self.stats()
+        return (f"Resampler {self.in_rate} Hz x{self.in_channels} -> {self.out_rate} Hz mono: "
+                f"{s['avg_ms']:.3f} ms avg, {s['max_ms']:.3f} ms max over {s['chunks']} chunks")
@@ -0,0 +1,144 @@
+"""Teleprompter core without any UI: audio in, script positions out.
+
+The Qt app, the command line tool (cli.py) and anything embedding Textream
+all drive a TeleprompterSession and listen for its position events.
+"""
+import threading
+import time
+from audio_engine import AudioEngine
+from fuzzy_matcher import FuzzyMatcher
+
+class TeleprompterSession:
+    """Matches recognized speech against a script and publishes the position.
+
+    Position events are dicts:
+        {"seq": n, "offset": chars read, "word": word index, "final": bool}
+    `seq` increases by one per event. Listeners are called on whichever
+    thread changed the position (the audio thread for speech unless the
+    results are routed elsewhere, e.g. to the Qt thread by the GUI).
+    """
+
+    def __init__(self, script="", lang="en", source=None, engine=None, tracer=None):
+        self.engine = engine or AudioEngine(source)
+        self.engine.on_result = self.handle_result
+        self.engine.on_finished = self._on_engine_finished
+        self.matcher = FuzzyMatcher()
+        self.lang = lang
+        self.tracer = tracer       # Optional latency.LatencyTracer
+        self.listeners = []        # Callback(event) per position change
+        self.on_finished = None    # Callback() when a finite source runs out
+        self.seq = 0
+        self._lock = threading.RLock() # Speech, UI and remote commands may move the position
+        self.set_script(script)
+
+    # --- Script ---
+    def set_script(self, text):
+        with self._lock:
+            self.matcher.set_text(text)
+            self._publish(final=True)
+
+    @property
+    def script(self):
+        return self.matcher.source_text
+
+    @property
+    def offset(self):
+        return self.matcher.recognized_char_count
+
+    @property
+    def spoken_offset(self):
+        """Where speech last matched; `offset` can be ahead of it after seek()."""
+        return self.matcher.spoken_char_count
+
+    # --- Audio ---
+    def load_model(self, lang=None):
+        """Loads the recognizer for `lang` (default: the session language). Blocks; returns success."""
+        self.lang = lang or self.lang
+        return self.engine.load_model(self.lang)
+
+    def start(self):
+        """Starts listening; False if the audio source couldn't be opened."""
+        return self.engine.start()
+
+    def wait(self, timeout=None):
+        self.engine.wait(timeout)
+
+    def pause(self):
+        self.engine.pause()
+
+    def resume(self):
+        self.engine.resume()
+
+    def set_mic_enabled(self, enabled):
+        self.engine.set_mic_enabled(enabled)
+
+    def close(self):
+        self.engine.close()
+        if self.tracer:
+            self.tracer.close()
+
+    # --- Position ---
+    def handle_result(self, text, is_final, captured=None, emitted=None):
+        """Feeds one recognizer result. `captured`/`emitted` are perf_counter() stamps for tracing."""
+        if not text.strip():
+            return
+        received = time.perf_counter()
+        with self._lock:
+            before = self.matcher.recognized_char_count
+            self.matcher.match(text)
+            matched = time.perf_counter()
+            moved = self.matcher.recognized_char_count != before
+            # Only a finished sentence moves the anchor the next match starts from
+            # (to where it was spoken, even if auto-advance shows more)
+            if is_final:
+                self.matcher.match_start_offset = self.matcher.spoken_char_count
+            if moved or is_final:
+                self._publish(is_final)
+        if self.tracer and captured is not None:
+            stamps = (is_final, captured, emitted or received, received, matched)
+            if moved and self.tracer.paint_stamps:
+                self.tracer.begin(*stamps) # Rendered once the display paints the new offset
+            else:
+                self.tracer.record(*stamps, time.perf_counter())
+
+    def jump_to(self, char_offset):
+        with self._lock:
+            self.matcher.jump_to(char_offset)
+            self._publish(final=True)
+
+    def seek(self, char_offset):
+        """Moves the shown position without touching the match anchor (auto-advance).
+
+        Speech keeps matching from where it was last anchored, so a partial
+        result in the middle of an utterance isn't matched twice.
+        """
+        with self._lock:
+            self.matcher.seek(char_offset)
+            self._publish(final=False)
+
+    def jump_to_word(self, word_index):
+        starts = self.matcher.word_starts
+        if starts:
+            self.jump_to(starts[max(0, min(word_index, len(starts) - 1))])
+
+    def rewind(self):
+        with self._lock:
+            self.jump_to(self.matcher.get_prev_word_offset())
+
+    def forward(self):
+        with self._lock:
+            self.jump_to(self.matcher.get_next_word_offset())
+
+    def position(self, final=False):
+        offset = self.matcher.recognized_char_count
+        return {"seq": self.seq, "offset": offset, "word": self.matcher.word_index_at(offset), "final": final}
+
+    def _publish(self, final):
+        self.seq += 1
+        event = self.position(final)
+        for listener in list(self.listeners):
+            listener(event)
+
+    def _on_engine_finished(self):
+        if self.on_finished:
+            self.on_finished()
@@ -1,74 +1,182 @@
-from PyQt6.QtCore import QSettings
+import json
+from PyQt6.QtCore import QObject, QSettings, QTimer, QCoreApplication, pyqtSignal
+
+class AppSettings(QObject):
+    """Settings kept in memory; QSettings (the registry on Windows) is read once.
+
+    Setters update the in-memory copy and emit `changed` right away; the
+    write to QSettings is batched and happens `flush_delay_ms` after the
+    last change, or on flush() / application exit.
+    """
+    changed = pyqtSignal(str) # Setting key, or "" after reset()
+    flush_delay_ms = 500
 
-class AppSettings:
     def __init__(self):
+        super().__init__()
         self.settings = QSettings("Textream", "TextreamWindows")
+        self._cache = {key: self.settings.value(key) for key in self.settings.allKeys()}
+        self._pending = {} # Changed keys not yet written
+        self._flush_timer = None
+
+    def _value(self, key, default):
+        return self._cache.get(key, default)
+
+    def _set(self, key, value):
+        if key in self._cache and self._cache[key] == value:
+            return # Nothing changed, nobody needs to re-read
+        self._cache[key] = value
+        self._pending[key] = value
+        self._schedule_flush()
+        self.changed.emit(key)
+
+    def _schedule_flush(self):
+        app = QCoreApplication.instance()
+        if app is None:
+            self.flush() # No event loop to batch on
+            return
+        if self._flush_timer is None:
+            self._flush_timer = QTimer(self)
+            self._flush_timer.setSingleShot(True)
+            self._flush_timer.timeout.connect(self.flush)
+            app.aboutToQuit.connect(self.flush)
+        self._flush_timer.start(self.flush_delay_ms)
+
+    def flush(self):
+        """Writes pending changes to QSettings."""
+        if self._flush_timer:
+            self._flush_timer.stop()
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        for key, value in pending.items():
+            self.settings.setValue(key, value)
+        self.settings.sync()
 
     @property
     def line_count(self):
-        return int(self.settings.value("line_count", 3))
+        return int(self._value("line_count", 3))
 
     @line_count.setter
     def line_count(self, value):
-        self.settings.setValue("line_count", value)
+        self._set("line_count", value)
 
     @property
     def waveform_color(self):
-        return self.settings.value("waveform_color", "#FFC832")
+        return self._value("waveform_color", "#FFC832")
 
     @waveform_color.setter
     def waveform_color(self, value):
-        self.settings.setValue("waveform_color", value)
+        self._set("waveform_color", value)
 
     @property
     def waveform_style(self):
-        return self.settings.value("waveform_style", "bars") # bars, dots, wave
+        return self._value("waveform_style", "bars") # bars, dots, wave
 
     @waveform_style.setter
     def waveform_style(self, value):
-        self.settings.setValue("waveform_style", value)
+        self._set("waveform_style", value)
         
     @property
     def theme(self):
-        return self.settings.value("theme", "dark") # dark, light
+        return self._value("theme", "dark") # dark, light
 
     @theme.setter
     def theme(self, value):
-        self.settings.setValue("theme", value)
+        self._set("theme", value)
 
     @property
     def text_color(self):
-        return self.settings.value("text_color", "#FFFFFF")
+        return self._value("text_color", "#FFFFFF")
 
     @text_color.setter
     def text_color(self, value):
-        self.settings.setValue("text_color", value)
+        self._set("text_color", value)
 
     @property
     def highlight_color(self):
-        return self.settings.value("highlight_color", "#FFC832") # Matching default waveform gold
+        return self._value("highlight_color", "#FFC832") # Matching default waveform gold
 
     @highlight_color.setter
     def highlight_color(self, value):
-        self.settings.setValue("highlight_color", value)
+        self._set("highlight_color", value)
 
     @property
     def font_family(self):
-        return self.settings.value("font_family", "Segoe UI")
+        return self._value("font_family", "Segoe UI")
 
     @font_family.setter
     def font_family(self, value):
-        self.settings.setValue("font_family", value)
+        self._set("font_family", value)
 
     @property
     def font_size(self):
-        return int(self.settings.value("font_size", 24))
+        return int(self._value("font_size", 24))
 
     @font_size.setter
     def font_size(self, value):
-        self.settings.setValue("font_size", value)
+        self._set("font_size", value)
+
+    @property
+    def last_language(self):
+        return self._value("last_language", "tr") # Preloaded at startup
+
+    @last_language.setter
+    def last_language(self, value):
+        self._set("last_language", value)
+
+    @property
+    def meter_fps(self):
+        return int(self._value("meter_fps", 30)) # Waveform refresh rate
+
+    @meter_fps.setter
+    def meter_fps(self, value):
+        self._set("meter_fps", value)
+
+    @property
+    def decode_in_process(self):
+        # QSettings hands back strings for bools on some backends
+        return str(self._value("decode_in_process", False)).lower() == "true"
+
+    @decode_in_process.setter
+    def decode_in_process(self, value):
+        self._set("decode_in_process", bool(value))
+
+    @property
+    def model_cache_mb(self):
+        return int(self._value("model_cache_mb", 1024)) # Memory cap for cached models
+
+    @model_cache_mb.setter
+    def model_cache_mb(self, value):
+        self._set("model_cache_mb", value)
+
+    @property
+    def partial_interval_ms(self):
+        return int(self._value("partial_interval_ms", 120)) # How often partial results are polled
+
+    @partial_interval_ms.setter
+    def partial_interval_ms(self, value):
+        self._set("partial_interval_ms", value)
+
+    @property
+    def extra_overlays(self):
+        """Mirror overlays for other screens, e.g. [{"screen": 1, "font_size": 40, "width": 900, "line_count": 4}]."""
+        try:
+            value = json.loads(self._value("extra_overlays", "[]"))
+        except ValueError:
+            print("Ignoring invalid extra_overlays setting")
+            return []
+        return value if isinstance(value, list) else []
+
+    @extra_overlays.setter
+    def extra_overlays(self, value):
+        self._set("extra_overlays", json.dumps(value))
 
     def reset(self):
+        self._cache.clear()
+        self._pending.clear()
+        if self._flush_timer:
+            self._flush_timer.stop()
         self.settings.clear()
+        self.changed.emit("")
 
 settings = AppSettings()
@@ -1,10 +1,13 @@
-from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QPushButton, QTextEdit, QLabel, QHBoxLayout, QComboBox, QFrame, QScrollArea, QGridLayout, QColorDialog, QFontDialog, QApplication
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QFont, QColor, QLinearGradient, QPalette, QBrush
+from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QPushButton, QPlainTextEdit, QLabel, QHBoxLayout, QComboBox, QFrame, QScrollArea, QGridLayout, QColorDialog, QFontDialog, QApplication
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer
+from PyQt6.QtGui import QFont, QColor, QLinearGradient, QPalette, QBrush, QTextCursor
 from settings import settings
+from language_detect import detect_language
 
 class MainWindow(QMainWindow):
     start_requested = pyqtSignal(str, str) # Emits (script text, lang_code)
+    language_selected = pyqtSignal(str) # Emits lang_code so its model can be loaded ahead of Start
+    script_language_detected = pyqtSignal(str) # Emits lang_code guessed from the pasted script
 
     from locales import TRANSLATIONS
     TRANSLATIONS = TRANSLATIONS
@@ -36,10 +39,19 @@ class MainWindow(QMainWindow):
         self.editor_cont_layout = QGridLayout(self.editor_container) # Grid for overlay
         self.editor_cont_layout.setContentsMargins(0,0,0,0)
         
-        self.text_editor = QTextEdit()
+        self.text_editor = QPlainTextEdit() # Plain-text editor: stays fast with multi-MB scripts
         self.text_editor.setPlaceholderText("Senaryonuzu buraya yapıştırın...")
         self.text_editor.setFont(QFont("Inter", 13))
+        self._last_edit = None # (position, chars added) of the latest edit
+        self.text_editor.document().contentsChange.connect(self._on_contents_change)
         self.text_editor.textChanged.connect(self._handle_text_edit)
+
+        # Guess the script's language once typing/pasting settles, not per keystroke
+        self._detect_timer = QTimer(self)
+        self._detect_timer.setSingleShot(True)
+        self._detect_timer.setInterval(700)
+        self._detect_timer.timeout.connect(self._detect_script_language)
+        self.text_editor.textChanged.connect(self._detect_timer.start)
         self.editor_cont_layout.addWidget(self.text_editor, 0, 0)
 
         # Floating Paste Button
@@ -203,9 +215,10 @@ class MainWindow(QMainWindow):
 
         # Background Gradient & Styles
         self._current_lang_code = "tr"
+        self._model_state = None # Load state of the selected language's model, None if unknown
         self._is_sample_active = True
         self.apply_premium_styles()
-        self._on_lang_changed("tr") # First run, also loads sample text
+        self._on_lang_changed(settings.last_language) # First run, also loads sample text
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
@@ -319,7 +332,7 @@ class MainWindow(QMainWindow):
         self.setWindowTitle(t["title"])
         self.title_label.setText(t["editor_title"])
         self.text_editor.setPlaceholderText(t["placeholder"])
-        self.btn_start.setText(t["start_btn"])
+        self._apply_start_state(t)
         
         self.lbl_lang.setText(t["lang_label"])
         self.lbl_theme.setText(t["theme_label"])
@@ -369,6 +382,18 @@ class MainWindow(QMainWindow):
         self.create_segmented_group(self.hc_layout, colors_map, settings.highlight_color, lambda v: self._update_setting("highlight_color", v), is_grid=True, show_picker=True, setting_key="highlight_color")
 
 
+    def set_model_state(self, lang_code, state):
+        """Reflects model loading progress; Start stays disabled while the selected model loads."""
+        if lang_code != self._current_lang_code:
+            return
+        self._model_state = state
+        self._apply_start_state(self.TRANSLATIONS.get(lang_code, self.TRANSLATIONS["en"]))
+
+    def _apply_start_state(self, t):
+        loading = self._model_state == "loading"
+        self.btn_start.setEnabled(not loading)
+        self.btn_start.setText(t["model_loading"] if loading else t["start_btn"])
+
     def _reset_settings(self):
         # Confirm with user? Usually for reset it's nice but user asked just to add it.
         # Let's just do it.
@@ -403,14 +428,14 @@ class MainWindow(QMainWindow):
             QMainWindow {{ background-color: {bg}; }}
             QWidget#centralWidget {{ background: {central_bg}; }}
             QLabel {{ color: {text_primary}; font-weight: 600; font-size: 11px; margin-top: 3px; }}
-            QTextEdit {{
+            QPlainTextEdit {{
                 background-color: {card_bg};
                 color: {text_primary if not self._is_sample_active else "#555"};
                 border: 1px solid {border_clr};
                 border-radius: 10px;
                 padding: 12px;
             }}
-            QTextEdit:focus {{ border: 1px solid #0078d4; }}
+            QPlainTextEdit:focus {{ border: 1px solid #0078d4; }}
             
             QPushButton#startBtn {{
                 background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0078d4, stop:1 #00a2ff);
@@ -422,6 +447,7 @@ class MainWindow(QMainWindow):
                 font-weight: 700;
             }}
             QPushButton#startBtn:hover {{ background: #106ebe; }}
+            QPushButton#startBtn:disabled {{ background: {btn_bg}; color: {text_secondary}; }}
 
             QPushButton {{ 
                 background-color: {btn_bg}; 
@@ -456,6 +482,7 @@ class MainWindow(QMainWindow):
 
     def _on_lang_changed(self, lang_code):
         self._current_lang_code = lang_code
+        self._model_state = None
         # Localize UI
         self.retranslate_ui(lang_code)
         
@@ -463,62 +490,83 @@ class MainWindow(QMainWindow):
         sample = t["sample_text"]
 
         # Only set sample if editor is empty or currently shows another sample
-        current_text = self.text_editor.toPlainText().strip()
-        is_current_a_sample = False
-        for lang in self.TRANSLATIONS.values():
-            if current_text == lang["sample_text"].strip():
-                is_current_a_sample = True
-                break
-        
-        if not current_text or is_current_a_sample:
+        # (the flag says so; no need to compare a possibly huge script)
+        if self._is_sample_active or self._editor_is_blank():
             self._is_sample_active = True
             self.text_editor.blockSignals(True)
-            self.text_editor.setText(sample)
+            self.text_editor.setPlainText(sample)
             self.text_editor.setStyleSheet(self.text_editor.styleSheet() + " color: #555;")
             self.text_editor.blockSignals(False)
 
+        self.language_selected.emit(lang_code)
+
     def _on_paste(self):
         clipboard = QApplication.clipboard()
         text = clipboard.text()
         if text:
             self._is_sample_active = False
             self.text_editor.setStyleSheet(self.text_editor.styleSheet().replace(" color: #555;", " color: #fff;"))
-            self.text_editor.setText(text)
+            self.text_editor.setPlainText(text) # Plain: no rich-text sniffing of a huge paste
+
+    def _on_contents_change(self, position, removed, added):
+        self._last_edit = (position, added)
 
     def _handle_text_edit(self):
+        if not self._is_sample_active:
+            return # Nothing to do per keystroke for the user's own script
+        # Any edit of the sample starts the user's script.
+        # User said: "üstüne yazmaya başladığımda otomatik olarak silinsin"
+        # Keep only what was just typed or pasted and remove the rest of the
+        # sample, with cursor edits around the inserted range (no full-text copies).
+        self._is_sample_active = False
+        # Remove the sample's dimmed color
+        self.text_editor.setStyleSheet(self.text_editor.styleSheet().replace(" color: #555;", " color: #fff;"))
+
+        position, added = self._last_edit or (0, 0)
+        end_of_text = self.text_editor.document().characterCount() - 1
+        end_of_edit = min(position + added, end_of_text)
+        cursor = QTextCursor(self.text_editor.document())
+        self.text_editor.blockSignals(True)
+        cursor.beginEditBlock()
+        cursor.setPosition(end_of_edit)
+        cursor.setPosition(end_of_text, QTextCursor.MoveMode.KeepAnchor)
+        cursor.removeSelectedText()
+        cursor.setPosition(0)
+        cursor.setPosition(min(position, end_of_edit), QTextCursor.MoveMode.KeepAnchor)
+        cursor.removeSelectedText()
+        cursor.endEditBlock()
+        self.text_editor.blockSignals(False)
+        # Move cursor to end
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        self.text_editor.setTextCursor(cursor)
+
+    def _editor_is_blank(self):
+        document = self.text_editor.document()
+        if document.isEmpty():
+            return True
+        # Whitespace counts as empty too, but only short texts are worth checking
+        return document.characterCount() <= 1000 and not self.text_editor.toPlainText().strip()
+
+    def _editor_head(self, chars):
+        """The first `chars` characters of the editor, without copying the whole script."""
+        cursor = QTextCursor(self.text_editor.document())
+        cursor.setPosition(min(chars, self.text_editor.document().characterCount() - 1), QTextCursor.MoveMode.KeepAnchor)
+        return cursor.selectedText().replace("\u2029", "\n") # Qt's paragraph separator
+
+    def _detect_script_language(self):
         if self._is_sample_active:
-            # Detect if user actually typed something
-            t = self.TRANSLATIONS.get(self._current_lang_code, self.TRANSLATIONS["en"])
-            sample = t["sample_text"]
-            current = self.text_editor.toPlainText()
-            
-            # if current text is no longer exactly the sample, user started edit
-            if current != sample:
-                self._is_sample_active = False
-                # Remove the sample's dimmed color
-                self.text_editor.setStyleSheet(self.text_editor.styleSheet().replace(" color: #555;", " color: #fff;"))
-                
-                # If the user typed a character, we want to keep ONLY that character
-                # and remove the rest of the sample text that might still be there.
-                # Simplest way: if length changed slightly, assume they typed 1 char.
-                if len(current) > 0:
-                    # Find the new character or just clear and let them start fresh?
-                    # Usually placeholders clear entirely. 
-                    # Let's find the new char by removing the sample part if possible, 
-                    # or just clear if the user prefers a clean slate.
-                    # User said: "üstüne yazmaya başladığımda otomatik olarak silinsin"
-                    # I will clear it and keep what they just typed.
-                    new_char = current.replace(sample, "") if sample in current else current[-1:]
-                    self.text_editor.blockSignals(True)
-                    self.text_editor.setText(new_char)
-                    # Move cursor to end
-                    cursor = self.text_editor.textCursor()
-                    cursor.movePosition(cursor.MoveOperation.End)
-                    self.text_editor.setTextCursor(cursor)
-                    self.text_editor.blockSignals(False)
+            return
+        lang_code = detect_language(self._editor_head(4000))
+        if lang_code:
+            print(f"Script language looks like: {lang_code}")
+            self.script_language_detected.emit(lang_code)
 
     def _on_start(self):
-        text = self.text_editor.toPlainText().strip()
+        if self.text_editor.document().isEmpty():
+            return
+        text = self.text_editor.toPlainText() # The one full copy, handed to the session
+        if text[:1].isspace() or text[-1:].isspace():
+            text = text.strip()
         lang = self._current_lang_code
         if text:
             self.start_requested.emit(text, lang)
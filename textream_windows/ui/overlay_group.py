@@ -0,0 +1,78 @@
+from PyQt6.QtWidgets import QApplication
+
+from .overlay_window import OverlayWindow
+from .script_view import ScriptBlocks
+
+class OverlayGroup:
+    """Several overlays (e.g. one per screen) driven by one script position.
+
+    The script is split into ScriptBlocks once and shared by all overlays;
+    each only lays out the few blocks it shows, in its own font. Position events are fanned out once per actual change, so
+    repeated partials that don't move the position cost nothing per window.
+    """
+
+    def __init__(self, primary):
+        self.primary = primary
+        self.overlays = [primary]
+        self.text = None
+        self.offset = 0
+        self._blocks = None
+
+    @classmethod
+    def from_settings(cls, primary, configs):
+        """Adds a mirror overlay per config dict (screen index, width, font_family, font_size, line_count, show_controls)."""
+        group = cls(primary)
+        screens = QApplication.screens()
+        for config in configs:
+            index = config.get("screen", 0)
+            if not 0 <= index < len(screens):
+                print(f"Overlay for screen {index} skipped: only {len(screens)} screen(s)")
+                continue
+            group.add(OverlayWindow(screen=screens[index],
+                                    width=config.get("width", 380),
+                                    font_family=config.get("font_family"),
+                                    font_size=config.get("font_size"),
+                                    line_count=config.get("line_count"),
+                                    show_controls=bool(config.get("show_controls", False))))
+        return group
+
+    def add(self, overlay):
+        self.overlays.append(overlay)
+        if self.text is not None:
+            overlay.set_text(self.text, self._blocks)
+            overlay.update_progress(self.offset)
+
+    def set_text(self, text):
+        self.text = text
+        self.offset = 0
+        self._blocks = ScriptBlocks(text)
+        for overlay in self.overlays:
+            overlay.set_text(text, self._blocks)
+
+    def show(self):
+        for overlay in self.overlays:
+            overlay.show()
+
+    def controlled(self):
+        """Overlays showing buttons and a waveform (always the primary one)."""
+        return [overlay for overlay in self.overlays if overlay.show_controls]
+
+    def update_audio(self, level):
+        for overlay in self.controlled():
+            overlay.update_audio(level)
+
+    def sync_controls(self, apply):
+        """Calls apply(prompter) on every overlay with controls, without re-emitting their signals."""
+        for overlay in self.controlled():
+            overlay.prompter.blockSignals(True)
+            apply(overlay.prompter)
+            overlay.prompter.blockSignals(False)
+
+    def on_position(self, event):
+        """Session listener: moves every overlay to the new offset."""
+        offset = event["offset"]
+        if offset == self.offset:
+            return
+        self.offset = offset
+        for overlay in self.overlays:
+            overlay.update_progress(offset)
@@ -1,6 +1,8 @@
+import time
+from math import ceil
 from PyQt6.QtWidgets import QMainWindow, QApplication, QMenu, QFontDialog, QColorDialog
 from PyQt6.QtCore import Qt, QPoint, QRect, QTimer, pyqtSignal
-from PyQt6.QtGui import QPainter, QPainterPath, QColor, QAction, QFont
+from PyQt6.QtGui import QPainter, QPixmap, QColor, QAction, QFont
 
 from .prompter_widget import PrompterWidget
 from settings import settings
@@ -8,12 +10,19 @@ from settings import settings
 class OverlayWindow(QMainWindow):
     language_changed = pyqtSignal(str) # Emits language code (e.g., 'tr', 'en')
 
-    def __init__(self):
+    def __init__(self, screen=None, width=380, font_family=None, font_size=None, line_count=None, show_controls=True):
         super().__init__()
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.Tool)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        self.target_screen = screen # QScreen to place the window on; primary if None
+        self.overlay_width = width
+        self.show_controls = show_controls
+        self._background = None # Rounded backdrop, rebuilt per size, theme and pixel ratio
+        self._background_key = None
+        self.paint_ms = 0.0 # Moving averages of the window's own paint cost
+        self.paint_area = 0.0 # Share of the window repainted per frame
         
-        self.prompter = PrompterWidget(self)
+        self.prompter = PrompterWidget(self, font_family, font_size, line_count, show_controls)
         self.setCentralWidget(self.prompter)
         
         # Initial size
@@ -24,47 +33,73 @@ class OverlayWindow(QMainWindow):
         self.apply_theme()
         
         self.current_language = "tr"
+        settings.changed.connect(self._on_setting_changed)
 
     def apply_theme(self):
-        # We can adjust colors based on settings.theme here
+        self._background = None
         self.update()
 
-    def refresh_settings(self):
-        """Syncs visuals with the latest global settings."""
-        self.apply_theme()
-        self.update_size()
-        self.prompter.update_display()
-        self.prompter.waveform.update() # Refresh waveform style/colors
+    def _on_setting_changed(self, key):
+        # The prompter restyles itself; the window only follows theme and size
+        if key in ("", "theme"):
+            self.apply_theme()
+        if key in ("", "font_family", "font_size", "line_count"):
+            self.update_size()
 
     def update_size(self):
         # Calculate width based on notch feel, height based on settings
-        line_height = self.prompter.text_edit.fontMetrics().lineSpacing()
-        height = line_height * settings.line_count + 110 # +110 for margins, controls, and waveform
-        self.resize(380, height)
+        line_height = self.prompter.script_view.line_spacing()
+        # +110 for margins, controls, and waveform (+40 for margins only on mirror displays)
+        height = ceil(line_height * self.prompter.lines()) + (110 if self.show_controls else 40)
+        if not self.prompter.debug_label.isHidden():
+            height += self.prompter.debug_label.sizeHint().height() + 5
+        self.resize(self.overlay_width, height)
         self.prompter.adjust_height()
 
     def center_top(self):
-        screen = QApplication.primaryScreen().geometry()
-        x = (screen.width() - self.width()) // 2
-        y = 0 
+        screen = self._screen_geometry()
+        x = screen.x() + (screen.width() - self.width()) // 2
+        y = screen.y()
         self.move(x, y)
 
+    def _background_pixmap(self):
+        ratio = self.devicePixelRatioF()
+        key = (self.width(), self.height(), settings.theme, ratio)
+        if self._background is None or self._background_key != key:
+            is_dark = settings.theme == "dark"
+            if is_dark:
+                bg_color = QColor(0, 0, 0, 240)
+            else:
+                bg_color = QColor(255, 255, 255, 245) # Light theme: creamy white
+            pixmap = QPixmap(round(self.width() * ratio), round(self.height() * ratio))
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setBrush(bg_color)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.drawRoundedRect(self.rect(), 20, 20)
+            painter.end()
+            self._background = pixmap
+            self._background_key = key
+        return self._background
+
     def paintEvent(self, event):
+        # Children repaint only their own rects (text band, waveform strip), so
+        # this usually copies a small piece of the cached backdrop.
+        start = time.perf_counter()
+        pixmap = self._background_pixmap()
+        ratio = pixmap.devicePixelRatio()
+        rect = event.rect() # Painting is clipped to the dirty region itself
+        source = QRect(round(rect.x() * ratio), round(rect.y() * ratio), round(rect.width() * ratio), round(rect.height() * ratio))
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
-        rect = self.rect()
-        is_dark = settings.theme == "dark"
-        
-        if is_dark:
-            bg_color = QColor(0, 0, 0, 240)
-        else:
-            bg_color = QColor(255, 255, 255, 245) # Light theme: creamy white
-            
-        painter.setBrush(bg_color)
-        painter.setPen(Qt.PenStyle.NoPen)
-        painter.drawRoundedRect(rect, 20, 20)
-    
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source) # Plain copy, no blending
+        painter.drawPixmap(rect, pixmap, source)
+        painter.end()
+        dirty = rect.width() * rect.height()
+        self.paint_ms += 0.1 * ((time.perf_counter() - start) * 1000 - self.paint_ms)
+        self.paint_area += 0.1 * (dirty / max(1, self.width() * self.height()) - self.paint_area)
+
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
             self.oldPos = event.globalPosition().toPoint()
@@ -172,11 +207,12 @@ class OverlayWindow(QMainWindow):
         
         menu.addSeparator()
 
-        mic_action = QAction(t["mic_on"] if self.prompter.is_mic_on else t["mic_off"], self)
-        mic_action.triggered.connect(self.prompter._toggle_mic)
-        menu.addAction(mic_action)
+        if self.show_controls:
+            mic_action = QAction(t["mic_on"] if self.prompter.is_mic_on else t["mic_off"], self)
+            mic_action.triggered.connect(self.prompter._toggle_mic)
+            menu.addAction(mic_action)
 
-        menu.addSeparator()
+            menu.addSeparator()
 
         quit_action = QAction(t["ctx_quit"], self)
         quit_action.triggered.connect(QApplication.quit)
@@ -190,7 +226,6 @@ class OverlayWindow(QMainWindow):
         if ok:
             settings.font_family = font.family()
             settings.font_size = font.pointSize()
-            self.refresh_settings()
 
     def _pick_custom_color(self, setting_key):
         color = QColorDialog.getColor(QColor(getattr(settings, setting_key)), self)
@@ -199,28 +234,37 @@ class OverlayWindow(QMainWindow):
 
     def _update_setting(self, key, value):
         setattr(settings, key, value)
-        self.refresh_settings()
         print(f"Setting updated: {key} = {value}")
 
 
     def center_bottom(self):
-        screen = QApplication.primaryScreen().geometry()
-        x = (screen.width() - self.width()) // 2
-        y = screen.height() - self.height() - 20
+        screen = self._screen_geometry()
+        x = screen.x() + (screen.width() - self.width()) // 2
+        y = screen.y() + screen.height() - self.height() - 20
         self.move(x, y)
 
     def center_screen(self):
-        screen = QApplication.primaryScreen().geometry()
-        x = (screen.width() - self.width()) // 2
-        y = (screen.height() - self.height()) // 2
+        screen = self._screen_geometry()
+        x = screen.x() + (screen.width() - self.width()) // 2
+        y = screen.y() + (screen.height() - self.height()) // 2
         self.move(x, y)
 
+    def _screen_geometry(self):
+        return (self.target_screen or QApplication.primaryScreen()).geometry()
+
     def update_audio(self, level):
         self.prompter.update_audio_level(level)
 
-    def set_text(self, text):
-        self.refresh_settings() # Sync with latest global settings
-        self.prompter.set_text(text)
+    def set_debug_text(self, text):
+        label = self.prompter.debug_label
+        lines_before = label.text().count("\n") if not label.isHidden() else -1
+        label.setText(text)
+        if lines_before != text.count("\n"):
+            label.show()
+            self.update_size()
+
+    def set_text(self, text, blocks=None):
+        self.prompter.set_text(text, blocks)
         self.center_top()
 
     def update_progress(self, count):
@@ -1,19 +1,53 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QTextEdit, QLabel, QHBoxLayout, QPushButton, QComboBox
-from PyQt6.QtCore import Qt, pyqtSignal, QTimer
-from PyQt6.QtGui import QColor, QPainter, QBrush, QTextCursor, QTextCharFormat, QFont, QPainterPath
+from math import ceil
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QHBoxLayout, QPushButton, QComboBox
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QRect, QLine, QPoint
+from PyQt6.QtGui import QColor, QPainter, QBrush, QPen, QFont, QPolygon
 from settings import settings
+from .script_view import ScriptView, ScriptBlocks
 
 class WaveformWidget(QWidget):
+    """Scrolling input level meter.
+
+    Levels go into a fixed ring buffer. Colors, brushes and pens for every
+    opacity step are built once per settings change, and bars of the same
+    step are drawn in one call where Qt allows it.
+    """
+    bar_count = 30
+    ramp_steps = 32 # Opacity steps between quiet (alpha 100) and loud (255)
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.levels = [0.0] * 30
+        self.levels = [0.0] * self.bar_count
+        self._head = 0 # Index of the oldest level
         self.setFixedHeight(30)
         self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self._apply_settings()
+        settings.changed.connect(self._on_setting_changed)
+
+    def _on_setting_changed(self, key):
+        if key in ("", "waveform_color", "waveform_style"):
+            self._apply_settings()
+            self.update()
+
+    def _apply_settings(self):
+        self.style = settings.waveform_style
+        base = QColor(settings.waveform_color)
+        self._brushes = []
+        self._pens = []
+        for step in range(self.ramp_steps):
+            color = QColor(base.red(), base.green(), base.blue(), int(100 + 155 * step / (self.ramp_steps - 1)))
+            self._brushes.append(QBrush(color))
+            self._pens.append(QPen(color))
 
     def update_level(self, level):
-        self.levels.append(level)
-        if len(self.levels) > 30:
-            self.levels.pop(0)
+        self.levels[self._head] = level
+        self._head = (self._head + 1) % self.bar_count
+        self.update()
+
+    def reset(self):
+        """Flattens the meter (e.g. when paused or muted)."""
+        self.levels = [0.0] * self.bar_count
+        self._head = 0
         self.update()
 
     def paintEvent(self, event):
@@ -22,53 +56,57 @@ class WaveformWidget(QWidget):
         
         width = self.width()
         height = self.height()
-        bar_count = len(self.levels)
-        bar_width = width / bar_count
-        
-        color_base = QColor(settings.waveform_color)
-        style = settings.waveform_style
-
-        for i, level in enumerate(self.levels):
-            h = max(4, level * height)
-            x = i * bar_width
-            y = (height - h) / 2
-            
-            alpha = int(100 + (level * 155))
-            color = QColor(color_base.red(), color_base.green(), color_base.blue(), alpha)
-            painter.setBrush(QBrush(color))
+        bar_width = width / self.bar_count
+        levels = self.levels[self._head:] + self.levels[:self._head] # Oldest first
+        top = self.ramp_steps - 1
+        steps = [min(top, int(level * top + 0.5)) for level in levels]
+        heights = [max(4, level * height) for level in levels]
+        style = self.style
+
+        if style in ("bars", "mirrored", "dots"):
             painter.setPen(Qt.PenStyle.NoPen)
-
-            if style == "bars":
-                painter.drawRoundedRect(int(x), int(y), int(bar_width - 2), int(h), 2, 2)
-            elif style == "dots":
-                dot_size = int(max(3, level * 10))
-                painter.drawEllipse(int(x + bar_width/2 - dot_size/2), int(height/2 - dot_size/2), dot_size, dot_size)
-            elif style == "wave":
-                if i > 0:
-                    prev_h = max(4, self.levels[i-1] * height)
-                    prev_y = (height - prev_h) / 2
-                    painter.setPen(color)
-                    painter.drawLine(int(x - bar_width), int(prev_y + prev_h/2), int(x), int(y + h/2))
-            elif style == "solid":
-                # Filled area wave
-                if i > 0:
-                    prev_h = max(4, self.levels[i-1] * height)
-                    path = QPainterPath()
-                    path.moveTo(x - bar_width, height)
-                    path.lineTo(x - bar_width, height - prev_h)
-                    path.lineTo(x, height - h)
-                    path.lineTo(x, height)
-                    path.closeSubpath()
-                    painter.fillPath(path, QBrush(color))
-            elif style == "mirrored":
-                # Bars expanding from center in both directions
-                center_y = height / 2
-                painter.drawRoundedRect(int(x), int(center_y - h/2), int(bar_width - 2), int(h), 1, 1)
-            elif style == "outline":
-                # Only borders
-                painter.setBrush(Qt.BrushStyle.NoBrush)
-                painter.setPen(color)
-                painter.drawRect(int(x), int(y), int(bar_width - 2), int(h))
+            last_step = None
+            for i, level in enumerate(levels):
+                if steps[i] != last_step:
+                    last_step = steps[i]
+                    painter.setBrush(self._brushes[last_step])
+                x = i * bar_width
+                h = heights[i]
+                if style == "bars":
+                    painter.drawRoundedRect(int(x), int((height - h) / 2), int(bar_width - 2), int(h), 2, 2)
+                elif style == "mirrored":
+                    # Bars expanding from center in both directions
+                    painter.drawRoundedRect(int(x), int(height / 2 - h / 2), int(bar_width - 2), int(h), 1, 1)
+                else:
+                    dot_size = int(max(3, level * 10))
+                    painter.drawEllipse(int(x + bar_width/2 - dot_size/2), int(height/2 - dot_size/2), dot_size, dot_size)
+        elif style == "outline":
+            # Only borders, one drawRects() per opacity step
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+            groups = {}
+            for i in range(self.bar_count):
+                h = heights[i]
+                groups.setdefault(steps[i], []).append(QRect(int(i * bar_width), int((height - h) / 2), int(bar_width - 2), int(h)))
+            for step, rects in groups.items():
+                painter.setPen(self._pens[step])
+                painter.drawRects(rects)
+        elif style == "wave":
+            # Segments from the previous bar's center to this one's, one drawLines() per opacity step
+            groups = {}
+            for i in range(1, self.bar_count):
+                x = i * bar_width
+                groups.setdefault(steps[i], []).append(QLine(int(x - bar_width), int(height / 2), int(x), int(height / 2)))
+            for step, lines in groups.items():
+                painter.setPen(self._pens[step])
+                painter.drawLines(lines)
+        elif style == "solid":
+            # Filled area wave
+            painter.setPen(Qt.PenStyle.NoPen)
+            for i in range(1, self.bar_count):
+                x = i * bar_width
+                painter.setBrush(self._brushes[steps[i]])
+                painter.drawPolygon(QPolygon([QPoint(int(x - bar_width), height), QPoint(int(x - bar_width), int(height - heights[i - 1])),
+                                              QPoint(int(x), int(height - heights[i])), QPoint(int(x), height)]))
 
 class PrompterWidget(QWidget):
     jump_requested = pyqtSignal(int)      # Emits char offset
@@ -76,30 +114,24 @@ class PrompterWidget(QWidget):
     rewind_requested = pyqtSignal()
     forward_requested = pyqtSignal()
     speed_changed = pyqtSignal(int)      # Emits speed level (0-5)
-    speed_changed = pyqtSignal(int)      # Emits speed level (0-5)
-    auto_advance_requested = pyqtSignal() # Emitted when timer ticks
+    auto_advance_requested = pyqtSignal() # Emitted once per display frame while auto-advance is on
     language_changed = pyqtSignal(str)   # Language switch
     mic_toggled = pyqtSignal(bool)       # Emits True if mic is ON (active)
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, font_family=None, font_size=None, line_count=None, show_controls=True):
         super().__init__(parent)
+        # Per-widget overrides of the global settings (e.g. a bigger font on a stage display)
+        self.font_family = font_family
+        self.font_size = font_size
+        self.line_count = line_count
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(10, 10, 10, 5)
         self.layout.setSpacing(5)
 
-        # Text Area
-        self.text_edit = QTextEdit()
-        self.text_edit.setReadOnly(True)
-        self.text_edit.setFrameStyle(0)
-        self.text_edit.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.text_edit.setStyleSheet("background: transparent; color: white;")
-        
-        font = QFont(settings.font_family, settings.font_size)
-        self.text_edit.setFont(font)
-        self.layout.addWidget(self.text_edit)
-
-        # Disable mouse interaction for text_edit so dragging the window is easier
-        self.text_edit.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        # Text Area: only the lines around the current position are laid out
+        # (mouse-transparent so dragging the window is easier)
+        self.script_view = ScriptView()
+        self.layout.addWidget(self.script_view)
 
         # Controls Layout
         self.controls_layout = QHBoxLayout()
@@ -159,23 +191,45 @@ class PrompterWidget(QWidget):
         self.waveform = WaveformWidget()
         self.layout.addWidget(self.waveform)
 
+        # Mirror displays only show the text
+        if not show_controls:
+            for btn in (self.btn_rewind, self.btn_play_pause, self.btn_mic, self.btn_speed, self.btn_forward):
+                btn.hide()
+            self.waveform.hide()
+
+        # Debug HUD (--debug-hud), hidden otherwise
+        self.debug_label = QLabel()
+        self.debug_label.setStyleSheet("color: #8f8; font-family: Consolas, monospace; font-size: 9px;")
+        self.debug_label.hide()
+        self.layout.addWidget(self.debug_label)
+
         self.full_text = ""
         self.current_offset = 0
+        self.apply_style()
+        self.apply_font_and_colors()
         
-        # Auto-advance timer
+        # Auto-advance frame timer; how far each frame moves is up to the receiver
         self.advance_timer = QTimer()
+        self.advance_timer.setTimerType(Qt.TimerType.PreciseTimer)
         self.advance_timer.timeout.connect(self._on_advance_tick)
 
+        # Look changes arrive here; position updates never touch styles or fonts
+        settings.changed.connect(self._on_setting_changed)
+
     def _cycle_speed(self):
-        self.speed_level = (self.speed_level + 1) % 6
+        self.set_speed((self.speed_level + 1) % 6)
+
+    def set_speed(self, level):
+        """Selects an auto-advance speed level (0 = off), as the speed button does."""
+        self.speed_level = level
         speeds = ["OFF", "1x", "2x", "3x", "4x", "5x"]
         self.btn_speed.setText(speeds[self.speed_level])
         
         if self.speed_level == 0:
             self.advance_timer.stop()
-        else:
-            interval = 300 - (self.speed_level * 50)
-            self.advance_timer.start(interval)
+        elif not self.advance_timer.isActive():
+            refresh = self.screen().refreshRate() if self.screen() else 60
+            self.advance_timer.start(max(1, round(1000 / (refresh or 60))))
         
         self.speed_changed.emit(self.speed_level)
 
@@ -188,39 +242,57 @@ class PrompterWidget(QWidget):
         self.btn_play_pause.setText("▶" if self.is_paused else "⏸")
         self.pause_requested.emit(self.is_paused)
 
+    def set_paused(self, paused):
+        """Pauses/resumes as if the button had been clicked (e.g. from a remote command)."""
+        if paused != self.is_paused:
+            self._toggle_pause()
+
     def _toggle_mic(self):
         self.is_mic_on = not self.is_mic_on
         self.btn_mic.setText("🎤" if self.is_mic_on else "🔇")
         self.mic_toggled.emit(self.is_mic_on)
 
-    def set_text(self, text):
+    def set_mic_on(self, on):
+        """Switches the mic button as if it had been clicked."""
+        if on != self.is_mic_on:
+            self._toggle_mic()
+
+    def text_font(self):
+        return QFont(self.font_family or settings.font_family, self.font_size or settings.font_size)
+
+    def lines(self):
+        return self.line_count or settings.line_count
+
+    def set_text(self, text, blocks=None):
+        """Shows a new script. `blocks` is its ScriptBlocks when several widgets share one."""
         self.full_text = text
         self.current_offset = 0
-        self.update_display()
+        self.script_view.set_blocks(blocks if blocks is not None else ScriptBlocks(text))
         self.adjust_height()
 
     def adjust_height(self):
         # Calculate height based on line_count setting
-        line_height = self.text_edit.fontMetrics().lineSpacing()
-        total_text_height = line_height * settings.line_count
-        self.text_edit.setFixedHeight(total_text_height + 20)
+        total_text_height = ceil(self.script_view.line_spacing() * self.lines())
+        self.script_view.setFixedHeight(total_text_height + 20)
 
     def update_progress(self, char_count):
         self.current_offset = char_count
-        self.update_display()
-        self.auto_scroll()
+        self.script_view.set_offset(char_count) # Repaints on the next frame
 
     def update_audio_level(self, level):
         self.waveform.update_level(level)
 
-    def update_display(self):
-        cursor = self.text_edit.textCursor()
-        scroll_val = self.text_edit.verticalScrollBar().value()
-        
-        if self.text_edit.toPlainText() != self.full_text:
-             self.text_edit.setText(self.full_text)
-
-        # Theme-aware styles for controls
+    def _on_setting_changed(self, key):
+        everything = key == ""
+        if everything or key == "theme":
+            self.apply_style()
+        if everything or key in ("font_family", "font_size", "text_color", "highlight_color"):
+            self.apply_font_and_colors()
+        if everything or key in ("font_family", "font_size", "line_count"):
+            self.adjust_height()
+
+    def apply_style(self):
+        """Theme-aware styles for controls."""
         is_dark = settings.theme == "dark"
         btn_fg = "white" if is_dark else "#333333"
         btn_bg_alpha = "15" if is_dark else "25"
@@ -244,32 +316,9 @@ class PrompterWidget(QWidget):
         self.btn_forward.setStyleSheet(btn_style)
         self.btn_speed.setStyleSheet(btn_style + "font-weight: bold; font-size: 9px;")
 
-        # Base Style
-        current_font = QFont(settings.font_family, settings.font_size)
-        self.text_edit.setFont(current_font)
-
+    def apply_font_and_colors(self):
         # Base Color (Dimmed)
         base_color = QColor(settings.text_color)
         base_color.setAlpha(80) # 80/255 opacity
-        
-        cursor.select(QTextCursor.SelectionType.Document)
-        format_dim = QTextCharFormat()
-        format_dim.setFont(current_font)
-        format_dim.setForeground(base_color)
-        cursor.setCharFormat(format_dim)
-        
-        if self.current_offset > 0:
-            cursor.setPosition(0)
-            cursor.setPosition(min(self.current_offset, len(self.full_text)), QTextCursor.MoveMode.KeepAnchor)
-            format_highlight = QTextCharFormat()
-            format_highlight.setFont(current_font)
-            format_highlight.setForeground(QColor(settings.highlight_color))
-            cursor.setCharFormat(format_highlight)
-        
-        self.text_edit.verticalScrollBar().setValue(scroll_val)
-
-    def auto_scroll(self):
-        cursor = self.text_edit.textCursor()
-        cursor.setPosition(self.current_offset)
-        self.text_edit.setTextCursor(cursor)
-        self.text_edit.ensureCursorVisible()
+        self.script_view.setFont(self.text_font())
+        self.script_view.set_colors(base_color, settings.highlight_color)
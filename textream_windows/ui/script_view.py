@@ -0,0 +1,273 @@
+import time
+from bisect import bisect_right
+from math import exp
+
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import Qt, QPointF, QTimer
+from PyQt6.QtGui import QPainter, QTextLayout, QTextOption, QTextCharFormat, QColor, QFont, QFontMetricsF
+
+class ScriptBlocks:
+    """A script split into paragraphs, long ones further cut into blocks of about `max_chars`.
+
+    Built once per script and shared read-only by every view showing it; a
+    view only ever lays out the few blocks around the current position.
+    Cuts prefer a sentence end, so the forced line break they cause is rarely
+    noticeable.
+    """
+
+    def __init__(self, text, max_chars=1500):
+        self.text = text
+        self.starts = [] # Char offset of each block in `text`
+        self.ends = []
+        pos = 0
+        for paragraph in text.split("\n"):
+            end_of_paragraph = pos + len(paragraph)
+            start = pos
+            while end_of_paragraph - start > max_chars:
+                cut = text.rfind(". ", start + max_chars // 2, start + max_chars)
+                if cut < 0:
+                    cut = text.rfind(" ", start + max_chars // 2, start + max_chars)
+                cut = cut + 1 if cut >= 0 else start + max_chars
+                self.starts.append(start)
+                self.ends.append(cut)
+                start = cut
+            self.starts.append(start)
+            self.ends.append(end_of_paragraph)
+            pos = end_of_paragraph + 1 # Skip the newline
+
+    def __len__(self):
+        return len(self.starts)
+
+    def block_text(self, index):
+        return self.text[self.starts[index]:self.ends[index]]
+
+    def block_at(self, offset):
+        return max(0, bisect_right(self.starts, offset) - 1)
+
+class ScriptView(QWidget):
+    """Draws the script around the current position, the current line on top.
+
+    Moving to another line is animated: while there is distance left, a timer
+    at the display's refresh rate eases the view toward the target line.
+    Bursts of recognizer results only move the target, so they still cost
+    one paint per frame.
+
+    Only blocks on screen (plus `margin_blocks` on each side) have a
+    QTextLayout; they are cached and dropped again as the position moves, so
+    memory and frame time don't depend on the script length. The read part
+    is drawn with a highlight FormatRange at paint time, so moving the
+    position changes no text formats at all.
+    """
+    padding = 4 # Like QTextDocument's default margin
+    scroll_time = 0.12 # Easing time constant in seconds; 0 jumps straight to the line
+    max_glide_blocks = 8 # Farther jumps than this aren't animated
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.blocks = ScriptBlocks("")
+        self.offset = 0
+        self.margin_blocks = 2
+        self._dim = QColor(255, 255, 255, 80)
+        self._highlight = QTextCharFormat()
+        self._layouts = {} # Block index -> QTextLayout
+        self._layout_width = None
+        self.on_painted = None # Callback() after the first paint that shows a new offset
+        self._painted_offset = None
+        # Top of the view: a block and a pixel offset into it
+        self._view_block = 0
+        self._view_y = 0.0
+        self._snap = True # Jump to the target on the next frame (new text, font or width)
+        self._last_frame = 0.0
+        self._frame_timer = QTimer(self)
+        self._frame_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._frame_timer.timeout.connect(self._on_frame)
+        self.setFont(QFont())
+
+    # --- State ---
+    def set_blocks(self, blocks):
+        self.blocks = blocks
+        self.offset = 0
+        self._layouts.clear()
+        self._snap = True
+        self.update()
+
+    def set_text(self, text):
+        self.set_blocks(ScriptBlocks(text))
+
+    def set_colors(self, dim, highlight):
+        self._dim = QColor(dim)
+        self._highlight = QTextCharFormat()
+        self._highlight.setForeground(QColor(highlight))
+        self.update()
+
+    def setFont(self, font):
+        super().setFont(font)
+        self._layouts.clear()
+        self._snap = True
+        self.update()
+
+    def set_offset(self, offset):
+        offset = max(0, min(offset, len(self.blocks.text)))
+        if offset != self.offset:
+            self.offset = offset
+            self.update() # The highlight moves right away
+            if not self._frame_timer.isActive():
+                refresh = self.screen().refreshRate() if self.screen() else 60
+                self._frame_timer.setInterval(max(1, round(1000 / (refresh or 60))))
+                self._last_frame = time.monotonic()
+                self._frame_timer.start()
+
+    def line_spacing(self):
+        return QFontMetricsF(self.font()).lineSpacing()
+
+    # --- Layout ---
+    def _layout(self, index):
+        layout = self._layouts.get(index)
+        if layout is None:
+            if self._layout_width is None: # Not resized yet (e.g. an overlay that was never shown)
+                self._layout_width = max(1, self.width() - 2 * self.padding)
+            layout = QTextLayout(self.blocks.block_text(index), self.font())
+            layout.setCacheEnabled(True)
+            option = QTextOption()
+            option.setWrapMode(QTextOption.WrapMode.WrapAtWordBoundaryOrAnywhere)
+            layout.setTextOption(option)
+            spacing = self.line_spacing()
+            y = 0.0
+            layout.beginLayout()
+            while True:
+                line = layout.createLine()
+                if not line.isValid():
+                    break
+                line.setLineWidth(self._layout_width)
+                line.setPosition(QPointF(0, y))
+                y += spacing
+            layout.endLayout()
+            self._layouts[index] = layout
+        return layout
+
+    def _block_height(self, index):
+        return self._layout(index).lineCount() * self.line_spacing()
+
+    def _current_line_y(self, index):
+        """Top of the line holding the current offset, within its block."""
+        layout = self._layout(index)
+        line = layout.lineForTextPosition(max(0, self.offset - self.blocks.starts[index]))
+        if not line.isValid():
+            line = layout.lineAt(layout.lineCount() - 1)
+        return line.y() if line.isValid() else 0.0
+
+    # --- Scrolling ---
+    def _target(self):
+        block = self.blocks.block_at(self.offset)
+        return block, self._current_line_y(block)
+
+    def _distance_to(self, block, y):
+        """Pixels from the view top to (block, y), or None if too far to glide."""
+        if abs(block - self._view_block) > self.max_glide_blocks:
+            return None
+        distance = y - self._view_y
+        for index in range(min(block, self._view_block), max(block, self._view_block)):
+            height = self._block_height(index)
+            distance += height if block > self._view_block else -height
+        return distance
+
+    def _scroll_by(self, dy):
+        self._view_y += dy
+        while self._view_y < 0 and self._view_block > 0:
+            self._view_block -= 1
+            self._view_y += self._block_height(self._view_block)
+        while self._view_block < len(self.blocks) - 1 and self._view_y >= self._block_height(self._view_block):
+            self._view_y -= self._block_height(self._view_block)
+            self._view_block += 1
+
+    def _on_frame(self):
+        now = time.monotonic()
+        elapsed, self._last_frame = now - self._last_frame, now
+        if not len(self.blocks):
+            self._frame_timer.stop()
+            return
+        block, y = self._target()
+        distance = None if self._snap else self._distance_to(block, y)
+        if distance is None or abs(distance) < 1.0 or self.scroll_time <= 0:
+            self._view_block, self._view_y = block, y
+            self._snap = False
+            self._frame_timer.stop()
+        else:
+            # Exponential easing, independent of the frame rate
+            self._scroll_by(distance * (1 - exp(-elapsed / self.scroll_time)))
+        self.update()
+
+    # --- Painting ---
+    def resizeEvent(self, event):
+        width = max(1, self.width() - 2 * self.padding)
+        if width != self._layout_width:
+            self._layout_width = width
+            self._layouts.clear()
+            self._snap = True
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        if not len(self.blocks):
+            return
+        if self._snap:
+            self._view_block, self._view_y = self._target()
+            self._snap = False
+        painter = QPainter(self)
+        painter.setPen(self._dim)
+        painter.setClipRect(self.rect())
+
+        current = min(self._view_block, len(self.blocks) - 1)
+        top = self.padding - self._view_y
+
+        # The current block and the ones below it, until the view is full
+        first = last = current
+        y = top
+        index = current
+        while index < len(self.blocks) and y < self.height():
+            self._draw_block(painter, index, y)
+            y += self._block_height(index)
+            last = index
+            index += 1
+
+        # Whatever of the previous blocks is still visible above
+        y = top
+        index = current - 1
+        while index >= 0 and y > 0:
+            y -= self._block_height(index)
+            self._draw_block(painter, index, y)
+            first = index
+            index -= 1
+        painter.end()
+        if self.offset != self._painted_offset:
+            self._painted_offset = self.offset
+            if self.on_painted:
+                self.on_painted()
+
+        # Recycle layouts that scrolled out of reach; keep a margin around the
+        # view and around the target (a glide between them is at most
+        # max_glide_blocks long, farther jumps snap)
+        target = self.blocks.block_at(self.offset)
+        if abs(target - current) <= self.max_glide_blocks:
+            first, last = min(first, target), max(last, target)
+            ranges = [(first - self.margin_blocks, last + self.margin_blocks)]
+        else:
+            ranges = [(first - self.margin_blocks, last + self.margin_blocks),
+                      (target - self.margin_blocks, target + self.margin_blocks)]
+        for index in [i for i in self._layouts if not any(lo <= i <= hi for lo, hi in ranges)]:
+            del self._layouts[index]
+        for lo, hi in ranges:
+            for index in range(max(0, lo), min(len(self.blocks), hi + 1)):
+                self._layout(index) # Lay out the margin now so scrolling into it doesn't stall
+
+    def _draw_block(self, painter, index, y):
+        layout = self._layout(index)
+        read = self.offset - self.blocks.starts[index]
+        selections = []
+        if read > 0:
+            highlight = QTextLayout.FormatRange()
+            highlight.start = 0
+            highlight.length = min(read, len(layout.text()))
+            highlight.format = self._highlight
+            selections.append(highlight)
+        layout.draw(painter, QPointF(self.padding, y), selections)